@@ -0,0 +1,150 @@
+import ast
+import operator
+import re
+import threading
+import time
+from typing import Optional
+
+
+# Pre-router for /chat: questions that are plain arithmetic ("what is 12 * 7")
+# are evaluated locally instead of going through the agent, which would need
+# one LLM call to pick a math tool and another to phrase the result.
+
+PREFIX_RE = re.compile(
+    r"^\s*(?:please\s+)?(?:what\s+is|what's|whats|how\s+much\s+is|calculate|compute|evaluate|solve)\s*:?\s*",
+    re.IGNORECASE,
+)
+SUFFIX_RE = re.compile(r"[\s?=!.]*$")
+WORD_OPERATORS = [
+    (re.compile(r"\bmultiplied\s+by\b", re.IGNORECASE), "*"),
+    (re.compile(r"\bdivided\s+by\b", re.IGNORECASE), "/"),
+    (re.compile(r"\btimes\b", re.IGNORECASE), "*"),
+    (re.compile(r"\bplus\b", re.IGNORECASE), "+"),
+    (re.compile(r"\bminus\b", re.IGNORECASE), "-"),
+    (re.compile(r"\bover\b", re.IGNORECASE), "/"),
+    (re.compile(r"\bmod(?:ulo)?\b", re.IGNORECASE), "%"),
+    (re.compile(r"(?<=\d)\s*[x×]\s*(?=[\d(])"), "*"),
+    (re.compile(r"÷"), "/"),
+]
+EXPRESSION_RE = re.compile(r"^[\d\s.+\-*/%()]+$")
+OPERATOR_RE = re.compile(r"\d\s*\)*\s*(?:\*\*|[+\-*/%])")
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+}
+MAX_EXPRESSION_LENGTH = 200
+MAX_EXPONENT = 100
+# ints beyond this many bits are refused before they are computed; a chain of
+# small powers like (9**99)**99 would otherwise block the event loop for seconds
+MAX_RESULT_BITS = 4096
+# "2024-12-25", "555-1234": dates and phone numbers, not subtractions
+HYPHENATED_DIGITS_RE = re.compile(r"\d-\d")
+
+
+def extract_expression(text: str) -> Optional[str]:
+    """Return the arithmetic expression in `text`, or None if it is anything else."""
+    # "15%" is a percentage, not modulo; only the spoken "mod" is accepted
+    if len(text) > MAX_EXPRESSION_LENGTH or "%" in text:
+        return None
+    expression = SUFFIX_RE.sub("", PREFIX_RE.sub("", text))
+    for pattern, symbol in WORD_OPERATORS:
+        expression = pattern.sub(f" {symbol} ", expression)
+    expression = " ".join(expression.replace(",", "").split())
+    if not expression or not EXPRESSION_RE.match(expression) or not OPERATOR_RE.search(expression):
+        return None
+    if HYPHENATED_DIGITS_RE.search(expression):
+        return None
+    return expression
+
+
+def _evaluate(node):
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body)
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        left, right = _evaluate(node.left), _evaluate(node.right)
+        _check_size(node.op, left, right)
+        return BINARY_OPERATORS[type(node.op)](left, right)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        return UNARY_OPERATORS[type(node.op)](_evaluate(node.operand))
+    raise ValueError(f"Unsupported expression: {ast.dump(node)}")
+
+
+def _check_size(op, left, right):
+    if isinstance(op, ast.Pow):
+        if abs(right) > MAX_EXPONENT:
+            raise ValueError("Exponent too large")
+        if isinstance(left, int) and isinstance(right, int) and abs(left) > 1 \
+                and abs(left).bit_length() * right > MAX_RESULT_BITS:
+            raise ValueError("Result too large")
+    elif isinstance(op, ast.Mult) and isinstance(left, int) and isinstance(right, int):
+        if abs(left).bit_length() + abs(right).bit_length() > MAX_RESULT_BITS:
+            raise ValueError("Result too large")
+
+
+def safe_eval(expression: str):
+    """Evaluate numbers, + - * / // % ** and parentheses only, with bounded int sizes; never calls eval()."""
+    return _evaluate(ast.parse(expression, mode="eval"))
+
+
+def format_number(value) -> str:
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        return f"{value:.10g}"
+    return str(value)
+
+
+class ArithmeticRouter:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "router_seconds": 0.0, "agent_runs": 0, "agent_seconds": 0.0}
+
+    def route(self, text: str) -> Optional[str]:
+        """Answer pure arithmetic locally; None means the question goes to the agent."""
+        start = time.perf_counter()
+        answer = None
+        expression = extract_expression(text)
+        if expression is not None:
+            try:
+                answer = f"{expression} = {format_number(safe_eval(expression))}"
+            except (SyntaxError, ValueError, ArithmeticError):
+                answer = None
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._stats["router_seconds"] += elapsed
+            self._stats["hits" if answer is not None else "misses"] += 1
+        return answer
+
+    def record_agent_run(self, seconds: float):
+        with self._lock:
+            self._stats["agent_runs"] += 1
+            self._stats["agent_seconds"] += seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        total = stats["hits"] + stats["misses"]
+        avg_agent = stats["agent_seconds"] / stats["agent_runs"] if stats["agent_runs"] else 0.0
+        return {
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "hit_rate": round(stats["hits"] / total, 4) if total else 0.0,
+            "avg_router_ms": round(stats["router_seconds"] / total * 1000, 3) if total else 0.0,
+            "avg_agent_seconds": round(avg_agent, 3),
+            # estimated from the mean agent latency of requests that fell through
+            "estimated_seconds_saved": round(stats["hits"] * avg_agent, 3),
+        }
@@ -0,0 +1,153 @@
+"""
+Offline retrieval and agent benchmark for chatbot.py.
+
+Sweeps chunking and retrieval parameters over a question set without any
+OpenAI call: embeddings come from the hash-based HashingEmbeddings and every
+LLM call (agent and RetrievalQA) is answered by ScriptedChatModel, with the
+agent built from chatbot.py's tools.
+
+For every combination it reports index build time, per-query retrieval
+latency and recall@k, and per question the agent latency, tool calls and
+LLM calls (nested RetrievalQA calls included).
+
+The scripted model does not read the prompt. Its tool calls follow the
+optional "plan" of each question (see fakes.ToolPlanScript), one pdf_search
+call by default, so the agent columns measure executor and tool overhead for
+a given plan, not the quality of the prompt.
+
+Usage:
+    python benchmarks/agent_harness.py --pdf attention.pdf
+    python benchmarks/agent_harness.py --pdf attention.pdf --chunk-size 300 500 1000 \\
+        --chunk-overlap 10 50 --k 3 5 --mode vector hybrid lexical --json results.json
+
+questions.json: [{"question": "...", "expected": "...",
+                  "plan": [[{"name": "pdf_search", "args": {"query": "..."}},
+                            {"name": "google_lookup", "args": {"query": "..."}}]]}, ...]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# chatbot.py copies these into os.environ at import; nothing is called with them
+os.environ.setdefault("OPENAI_API_KEY", "offline")
+os.environ.setdefault("SERPER_API_KEY", "offline")
+
+from langchain.chains import RetrievalQA  # noqa: E402
+from langchain.agents import AgentExecutor, create_tool_calling_agent  # noqa: E402
+from langchain.text_splitter import RecursiveCharacterTextSplitter  # noqa: E402
+from langchain_community.document_loaders import PyPDFLoader  # noqa: E402
+from langchain_community.vectorstores import Chroma  # noqa: E402
+
+import chatbot  # noqa: E402
+from bench_retrieval import DEFAULT_QUESTIONS, evaluate  # noqa: E402
+from bm25_index import BM25Index, HybridRetriever  # noqa: E402
+from fakes import FakeSearch, HashingEmbeddings, ScriptedChatModel, ToolPlanScript  # noqa: E402
+
+
+def build_index(pages, chunk_size: int, chunk_overlap: int, embeddings):
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    start = time.perf_counter()
+    documents = splitter.split_documents(pages)
+    db = Chroma.from_documents(documents, embeddings, collection_name=f"harness-{uuid.uuid4().hex}")
+    index = BM25Index(documents)
+    return db, index, len(documents), time.perf_counter() - start
+
+
+def build_agent(retriever, llm):
+    """Point chatbot.py's tools at the offline retriever and model, then build its agent."""
+    chatbot.llm = llm
+    chatbot.retriever = retriever
+    chatbot.qa_chain = RetrievalQA.from_chain_type(llm=llm, retriever=retriever, return_source_documents=False)
+    chatbot.answer_cache = None
+    chatbot.google_search = FakeSearch()
+    agent = create_tool_calling_agent(
+        llm=llm, tools=chatbot.tools, prompt=chatbot.prompt
+    ).with_config(tags=[chatbot.AGENT_TAG])
+    return AgentExecutor(agent=agent, tools=chatbot.tools, return_intermediate_steps=True)
+
+
+def run_agent(executor, llm, questions) -> dict:
+    tool_calls, calls, latencies = [], [], []
+    for item in questions:
+        before = llm.stats.get("calls", 0)
+        start = time.perf_counter()
+        # the serving path: ainvoke runs the tool calls of one step concurrently
+        result = asyncio.run(executor.ainvoke({"input": item["question"], "chat_history": []}))
+        latencies.append(time.perf_counter() - start)
+        tool_calls.append(len(result["intermediate_steps"]))
+        calls.append(llm.stats.get("calls", 0) - before)
+    return {
+        "tool_calls": statistics.mean(tool_calls),
+        "llm_calls": statistics.mean(calls),
+        "agent_p50_ms": statistics.median(latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", default="attention.pdf")
+    parser.add_argument("--questions", help="JSON file with question/expected pairs and optional tool plans")
+    parser.add_argument("--chunk-size", type=int, nargs="+", default=[500])
+    parser.add_argument("--chunk-overlap", type=int, nargs="+", default=[10])
+    parser.add_argument("--k", type=int, nargs="+", default=[3])
+    parser.add_argument("--mode", nargs="+", default=["vector", "hybrid", "lexical"],
+                        choices=["vector", "hybrid", "lexical"])
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated seconds per LLM call")
+    parser.add_argument("--json", help="write all results to this file")
+    args = parser.parse_args()
+
+    questions = DEFAULT_QUESTIONS
+    if args.questions:
+        with open(args.questions, "r", encoding="utf-8") as f:
+            questions = json.load(f)
+
+    pages = PyPDFLoader(args.pdf).load()
+    embeddings = HashingEmbeddings()
+    plans = {item["question"]: item["plan"] for item in questions if item.get("plan")}
+    llm = ScriptedChatModel(script=ToolPlanScript(plans), latency=args.llm_latency)
+    # start the Chroma client up front so it is not billed to the first build
+    Chroma(collection_name="harness-warmup", embedding_function=embeddings)
+
+    print(f"{len(pages)} pages, {len(questions)} questions\n")
+    header = (f"{'size':>5} {'ovl':>4} {'k':>3} {'mode':>8} {'chunks':>6} {'build ms':>9} "
+              f"{'ret p50 ms':>10} {'recall':>7} {'agent ms':>9} {'tools':>6} {'llm':>5}")
+    print(header)
+
+    results = []
+    for chunk_size, chunk_overlap in itertools.product(args.chunk_size, args.chunk_overlap):
+        if chunk_overlap >= chunk_size:
+            continue
+        db, index, chunks, build_seconds = build_index(pages, chunk_size, chunk_overlap, embeddings)
+        for k, mode in itertools.product(args.k, args.mode):
+            retriever = HybridRetriever(
+                index=index,
+                vector_retriever=db.as_retriever(search_kwargs={"k": k if mode == "vector" else k * 2}),
+                k=k,
+                mode=mode,
+            )
+            retrieval = evaluate(retriever, questions, k)
+            agent = run_agent(build_agent(retriever, llm), llm, questions)
+            row = {
+                "chunk_size": chunk_size, "chunk_overlap": chunk_overlap, "k": k, "mode": mode,
+                "chunks": chunks, "build_ms": build_seconds * 1000, **retrieval, **agent,
+            }
+            results.append(row)
+            print(f"{chunk_size:>5} {chunk_overlap:>4} {k:>3} {mode:>8} {chunks:>6} {row['build_ms']:>9.1f} "
+                  f"{row['p50_ms']:>10.2f} {row['recall']:>7.2f} {row['agent_p50_ms']:>9.1f} "
+                  f"{row['tool_calls']:>6.2f} {row['llm_calls']:>5.2f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
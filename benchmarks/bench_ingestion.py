@@ -0,0 +1,89 @@
+"""
+Ingestion throughput in chunks per second.
+
+Streams PDFs (or a synthetic corpus) through IngestionPipeline into a fresh
+Chroma collection and reports pages, chunks and chunks/s for each worker
+count. The local HashingEmbeddings is used by default, with --latency
+simulating the round trip of one embedding request.
+
+Usage:
+    python benchmarks/bench_ingestion.py --pdf-dir ./pdfs --workers 1 4 8
+    python benchmarks/bench_ingestion.py --synthetic 200 --latency 0.2
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter  # noqa: E402
+from langchain_community.vectorstores import Chroma  # noqa: E402
+from langchain_core.documents import Document  # noqa: E402
+
+from fakes import HashingEmbeddings  # noqa: E402
+from ingestion import IngestionPipeline, discover_sources, iter_pdf_pages  # noqa: E402
+from vector_index import document_id  # noqa: E402
+
+
+class SlowEmbeddings(HashingEmbeddings):
+    """Adds a fixed delay per embed_documents call, like a remote API would."""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+
+    def embed_documents(self, texts):
+        time.sleep(self.latency)
+        return super().embed_documents(texts)
+
+
+def synthetic_pages(path: str):
+    for page in range(10):
+        text = " ".join(f"word{(page * 31 + i) % 997} sentence {i}." for i in range(400))
+        yield Document(page_content=text, metadata={"source": path, "page": page})
+
+
+def run(paths, loader, workers: int, batch_size: int, latency: float) -> dict:
+    db = Chroma(collection_name=f"bench-{uuid.uuid4().hex}", embedding_function=SlowEmbeddings(latency))
+    splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=10)
+    pipeline = IngestionPipeline(db, splitter, batch_size=batch_size, workers=workers, loader=loader)
+    start = time.perf_counter()
+    try:
+        for path in paths:
+            pipeline.ingest_file(path, document_id=document_id(path))
+        pipeline.wait()
+    finally:
+        pipeline.close()
+    stats = pipeline.stats()
+    stats["wall_seconds"] = time.perf_counter() - start
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf-dir", help="folder of PDFs to ingest")
+    parser.add_argument("--synthetic", type=int, default=50, help="number of synthetic 10-page documents")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.1, help="simulated seconds per embedding request")
+    args = parser.parse_args()
+
+    if args.pdf_dir:
+        paths, loader = discover_sources([args.pdf_dir]), iter_pdf_pages
+    else:
+        tmp = tempfile.gettempdir()
+        paths, loader = [os.path.join(tmp, f"synthetic-{i}.pdf") for i in range(args.synthetic)], synthetic_pages
+
+    print(f"{len(paths)} documents, batch size {args.batch_size}, {args.latency * 1000:.0f} ms per embedding request")
+    print(f"{'workers':>7} {'pages':>7} {'chunks':>7} {'seconds':>8} {'chunks/s':>9}")
+    for workers in args.workers:
+        stats = run(paths, loader, workers, args.batch_size, args.latency)
+        print(f"{workers:>7} {stats['pages']:>7} {stats['embedded_chunks']:>7} "
+              f"{stats['wall_seconds']:>8.2f} {stats['embedded_chunks'] / stats['wall_seconds']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Latency and recall of the pdf_search retrievers.
+
+Compares the previous retriever (db.as_retriever(k=3)) with the BM25
+lexical retriever and the hybrid retriever over the same chunks. A question
+counts as recalled when one of the top-k chunks contains its expected text.
+
+Usage:
+    python benchmarks/bench_retrieval.py --pdf attention.pdf
+    python benchmarks/bench_retrieval.py --pdf attention.pdf --openai --questions questions.json
+
+questions.json: [{"question": "...", "expected": "text the right chunk contains"}, ...]
+By default embeddings come from the local HashingEmbeddings, so the vector
+numbers only show the relative cost; pass --openai for real embedding latency.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter  # noqa: E402
+from langchain_community.document_loaders import PyPDFLoader  # noqa: E402
+from langchain_community.vectorstores import Chroma  # noqa: E402
+
+from bm25_index import BM25Index, HybridRetriever, LexicalRetriever  # noqa: E402
+from fakes import HashingEmbeddings  # noqa: E402
+
+# Questions about "Attention Is All You Need" (attention.pdf).
+DEFAULT_QUESTIONS = [
+    {"question": "What BLEU score does the big Transformer get on WMT 2014 English-to-German?", "expected": "28.4"},
+    {"question": "What is the dimension of the inner feed-forward layer?", "expected": "2048"},
+    {"question": "Which optimizer was used for training?", "expected": "Adam"},
+    {"question": "What GPUs were the models trained on?", "expected": "P100"},
+    {"question": "How long did it take to train the big model?", "expected": "3.5 days"},
+    {"question": "Which functions are used for the positional encodings?", "expected": "sine and cosine"},
+    {"question": "How many training steps were used for the base model?", "expected": "100,000 steps"},
+    {"question": "How is scaled dot-product attention computed?", "expected": "Scaled Dot-Product Attention"},
+    {"question": "How many parallel attention heads are employed?", "expected": "heads"},
+    {"question": "Which dataset was used for English constituency parsing?", "expected": "Penn Treebank"},
+    {"question": "What label smoothing value was used during training?", "expected": "label smoothing"},
+    {"question": "What is the model dimension d_model of the base model?", "expected": "512"},
+]
+
+
+def load_documents(pdf_path: str, chunk_size: int, chunk_overlap: int):
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return splitter.split_documents(PyPDFLoader(pdf_path).load())
+
+
+def is_relevant(doc, expected: str) -> bool:
+    return expected.lower() in doc.page_content.lower()
+
+
+def evaluate(retriever, questions, k: int) -> dict:
+    latencies = []
+    hits = 0
+    for item in questions:
+        start = time.perf_counter()
+        docs = retriever.invoke(item["question"])
+        latencies.append(time.perf_counter() - start)
+        if any(is_relevant(doc, item["expected"]) for doc in docs[:k]):
+            hits += 1
+    return {
+        "recall": hits / len(questions),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pdf", default="attention.pdf")
+    parser.add_argument("--questions", help="JSON file with question/expected pairs")
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--chunk-overlap", type=int, default=10)
+    parser.add_argument("--openai", action="store_true", help="use OpenAIEmbeddings instead of the local fake")
+    args = parser.parse_args()
+
+    questions = DEFAULT_QUESTIONS
+    if args.questions:
+        with open(args.questions, "r", encoding="utf-8") as f:
+            questions = json.load(f)
+
+    if args.openai:
+        from langchain_openai import OpenAIEmbeddings
+        embeddings = OpenAIEmbeddings()
+    else:
+        embeddings = HashingEmbeddings()
+
+    documents = load_documents(args.pdf, args.chunk_size, args.chunk_overlap)
+
+    start = time.perf_counter()
+    db = Chroma.from_documents(documents, embeddings, collection_name=f"bench-{uuid.uuid4().hex}")
+    vector_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = BM25Index(documents)
+    lexical_build = time.perf_counter() - start
+
+    print(f"{len(documents)} chunks, {len(questions)} questions, k={args.k}")
+    print(f"index build: vector {vector_build * 1000:.1f} ms, BM25 {lexical_build * 1000:.1f} ms\n")
+
+    retrievers = {
+        "vector (current)": db.as_retriever(search_kwargs={"k": args.k}),
+        "lexical (BM25)": LexicalRetriever(index=index, k=args.k),
+        "hybrid (RRF)": HybridRetriever(
+            index=index,
+            vector_retriever=db.as_retriever(search_kwargs={"k": args.k * 2}),
+            k=args.k,
+            mode="hybrid",
+        ),
+    }
+    print(f"{'retriever':<18} {'recall@' + str(args.k):>9} {'p50 ms':>9} {'max ms':>9}")
+    for name, retriever in retrievers.items():
+        result = evaluate(retriever, questions, args.k)
+        print(f"{name:<18} {result['recall']:>9.2f} {result['p50_ms']:>9.2f} {result['max_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
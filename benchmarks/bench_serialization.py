@@ -0,0 +1,103 @@
+"""
+Microbenchmark for serializing large /cv_parser batch responses.
+
+Compares the old path (json.dumps -> json.loads -> stdlib JSONResponse encode)
+with the new one (validated CVParserResponse -> ORJSONResponse).
+
+Usage:
+    python benchmarks/bench_serialization.py --files 5000 --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import ORJSONResponse  # noqa: E402
+
+from schemas import CVFileResult, CVParsedData, CVParserResponse  # noqa: E402
+
+
+def sample_cv(i: int) -> dict:
+    return {
+        "firstName": f"Jörg{i}",
+        "lastName": "Müller",
+        "email": f"candidate{i}@example.com",
+        "mobile": "+49 170 1234567",
+        "about": "<div><p>" + "Experienced backend engineer. " * 20 + "</p></div>",
+        "profilePicture": "",
+        "title": None,
+        "zip": "10115",
+        "street": "Unter den Linden 1",
+        "address": "Berlin, Germany",
+        "websiteLink": "",
+        "education": [
+            {"institution": "TU Berlin", "degree": "MSc Computer Science", "date": "2015-09-30"},
+            {"institution": "TU Berlin", "degree": "BSc Computer Science", "date": "2013-07-31"},
+        ],
+        "experience": [
+            {
+                "companyName": f"Company {j}",
+                "role": "Senior Engineer",
+                "startDate": "2018-01-01",
+                "endDate": "2021-12-31",
+                "description": "Built and operated distributed services. " * 10,
+            }
+            for j in range(4)
+        ],
+        "skills": ["Python", "FastAPI", "PostgreSQL", "Kubernetes", "AWS", "Redis"],
+    }
+
+
+def old_path(raw_results):
+    response_data = {"message": "All files processed in 1.00 seconds.", "results": raw_results}
+    content = json.loads(json.dumps(response_data, ensure_ascii=False, separators=(',', ':')))
+    # starlette.responses.JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode("utf-8")
+
+
+def new_path(typed_results):
+    response = CVParserResponse(message="All files processed in 1.00 seconds.", results=typed_results)
+    # what cv_parser returns: ORJSONResponse(response.model_dump(mode="json")), rendered
+    return ORJSONResponse(response.model_dump(mode="json")).body
+
+
+def measure(fn, arg, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(timings), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000, help="number of CV results in the batch")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    raw_results = [{"file": f"cv_{i}.pdf", "parsed_data": sample_cv(i)} for i in range(args.files)]
+    typed_results = [
+        CVFileResult(file=r["file"], parsed_data=CVParsedData.model_validate(r["parsed_data"]))
+        for r in raw_results
+    ]
+
+    size = len(new_path(typed_results))
+    print(f"batch: {args.files} CVs, {size / 1024 / 1024:.1f} MiB response body")
+
+    for name, fn, arg in (("stdlib json (old)", old_path, raw_results), ("orjson + model (new)", new_path, typed_results)):
+        best, peak = measure(fn, arg, args.repeat)
+        print(f"{name:<22} best {best * 1000:8.1f} ms   peak alloc {peak / 1024 / 1024:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
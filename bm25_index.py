@@ -0,0 +1,143 @@
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from typing import List, Optional
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+
+# Local BM25 inverted index over the same chunks as the Chroma store.
+#
+# LexicalRetriever answers keyword-heavy questions ("BLEU score in table 2")
+# without an embedding round trip. HybridRetriever fuses the lexical and the
+# vector rankings with reciprocal rank fusion.
+
+RETRIEVER_MODE = os.getenv("RETRIEVER_MODE", "hybrid")
+RETRIEVER_K = int(os.getenv("RETRIEVER_K", "3"))
+
+TOKEN_RE = re.compile(r"\w+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from how in is it of on or that the this to was what when where which who why with"
+    .split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+
+    def __init__(self, documents: List[Document], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.documents = []
+        self.doc_lengths = []
+        self.postings = defaultdict(list)  # term -> [(doc index, term frequency)]
+        self.add_documents(documents)
+
+    def add_documents(self, documents: List[Document]):
+        for doc in documents:
+            index = len(self.documents)
+            terms = Counter(tokenize(doc.page_content))
+            self.documents.append(doc)
+            self.doc_lengths.append(sum(terms.values()))
+            for term, tf in terms.items():
+                self.postings[term].append((index, tf))
+        total = sum(self.doc_lengths)
+        self.avg_length = total / len(self.doc_lengths) if self.doc_lengths else 0.0
+
+    def idf(self, term: str) -> float:
+        df = len(self.postings.get(term, ()))
+        n = len(self.documents)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = RETRIEVER_K, filter: Optional[dict] = None) -> List[tuple]:
+        """Top-k (document, score) pairs; `filter` matches metadata by equality."""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for index, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[index] / self.avg_length)
+                scores[index] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        results = []
+        for index, score in ranked:
+            doc = self.documents[index]
+            if filter and any(doc.metadata.get(key) != value for key, value in filter.items()):
+                continue
+            results.append((doc, score))
+            if len(results) == k:
+                break
+        return results
+
+
+def documents_from_store(db) -> List[Document]:
+    """All chunks stored in a Chroma collection, to build the lexical index from."""
+    data = db.get(include=["documents", "metadatas"])
+    return [
+        Document(page_content=text, metadata=metadata or {})
+        for text, metadata in zip(data["documents"], data["metadatas"])
+    ]
+
+
+class LexicalRetriever(BaseRetriever):
+    index: BM25Index
+    k: int = RETRIEVER_K
+    filter: Optional[dict] = None
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return [doc for doc, _ in self.index.search(query, self.k, self.filter)]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    mode="lexical": BM25 only, no embedding call.
+    mode="vector":  the Chroma retriever only.
+    mode="hybrid":  both, merged by reciprocal rank fusion.
+    """
+    index: BM25Index
+    vector_retriever: BaseRetriever
+    k: int = RETRIEVER_K
+    mode: str = RETRIEVER_MODE
+    lexical_weight: float = 1.0
+    vector_weight: float = 1.0
+    rrf_k: int = 60
+    filter: Optional[dict] = None
+
+    model_config = {"arbitrary_types_allowed": True}
+
+    def with_filter(self, filter: Optional[dict]) -> "HybridRetriever":
+        """Copy restricted to chunks whose metadata matches `filter` (e.g. {"document_id": ...})."""
+        vector_retriever = self.vector_retriever
+        if hasattr(vector_retriever, "vectorstore"):
+            search_kwargs = {**vector_retriever.search_kwargs, "filter": filter}
+            vector_retriever = vector_retriever.vectorstore.as_retriever(search_kwargs=search_kwargs)
+        return self.model_copy(update={"filter": filter, "vector_retriever": vector_retriever})
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        if self.mode == "lexical":
+            return [doc for doc, _ in self.index.search(query, self.k, self.filter)]
+        vector_docs = self.vector_retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        if self.mode == "vector":
+            return vector_docs[:self.k]
+
+        # candidates from both lists, ranked by sum(weight / (rrf_k + rank))
+        lexical_docs = [doc for doc, _ in self.index.search(query, self.k * 2, self.filter)]
+        fused = {}
+        for weight, docs in ((self.lexical_weight, lexical_docs), (self.vector_weight, vector_docs)):
+            for rank, doc in enumerate(docs, start=1):
+                key = doc.page_content
+                score, _ = fused.get(key, (0.0, doc))
+                fused[key] = (score + weight / (self.rrf_k + rank), doc)
+        ranked = sorted(fused.values(), key=lambda item: item[0], reverse=True)
+        return [doc for _, doc in ranked[:self.k]]
@@ -1,58 +1,85 @@
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader
-from langchain_openai import OpenAIEmbeddings
-from langchain_community.vectorstores import Chroma
-from langchain.chains import RetrievalQA
-from langchain_openai import ChatOpenAI
-from langchain.tools import tool
-from langchain.llms.openai import OpenAI
-from langchain.utilities import GoogleSerperAPIWrapper
-from langchain.agents import initialize_agent, Tool
-from langchain.agents import AgentType
-from langchain.agents import AgentExecutor, create_tool_calling_agent
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.memory import ConversationBufferMemory
-from fastapi import FastAPI
+from langchain_core.tools import tool
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
+from sse_starlette.sse import EventSourceResponse
+from contextlib import asynccontextmanager
+from typing import List, Optional
+import asyncio
+import json
 import os
+import time
+import uuid
 from dotenv import load_dotenv
-from langchain_core.output_parsers import StrOutputParser
+from session_memory import SessionMemoryStore
+from arithmetic_router import ArithmeticRouter
+from tool_cache import TTLCache, normalize_query
+from tracing import Trace, TraceCallbackHandler, export, exporter
 load_dotenv()
 os.environ['OPENAI_API_KEY'] = os.getenv("OPENAI_API_KEY")
 os.environ['SERPER_API_KEY'] = os.getenv("SERPER_API_KEY")
 
 
-# PDF LOADER
-loader=PyPDFLoader("attention.pdf")
-text_documents=loader.load()
-text_documents
-text_splitter=RecursiveCharacterTextSplitter(chunk_size=500,chunk_overlap=10)
-documents=text_splitter.split_documents(text_documents)
-db = Chroma.from_documents(documents,OpenAIEmbeddings())
+# Everything expensive (OpenAI clients, PDF ingestion, Chroma, BM25, the agent)
+# is built by warm_up() in a background task once the server is up. Until it
+# finishes /readyz answers 503 and /chat either waits or answers 503.
+embeddings = None
+db = None
+ingestion_stats = None
+retriever = None
+llm = None
+qa_chain = None
+answer_cache = None
+google_search = None
+agent_executor = None
+indexed_sources = {}  # document_id -> PDF path
 
-retriever = db.as_retriever(search_kwargs={"k": 3})
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+# PDF TOOL
+def match_sources(source: str) -> list:
+    """document_ids of the indexed PDFs whose path is `source` or ends with it."""
+    wanted = source.replace("\\", "/").strip()
+    return [
+        document_id for document_id, path in indexed_sources.items()
+        if path.replace("\\", "/") == wanted or path.replace("\\", "/").endswith("/" + wanted)
+    ]
 
-qa_chain = RetrievalQA.from_chain_type(
-    llm=llm,
-    retriever=retriever,
-    return_source_documents=False
-)
+def run_qa(query: str, document_id: Optional[str]) -> str:
+    if not document_id:
+        return qa_chain.run(query)
+    # restrict retrieval to one indexed file
+    chain = qa_chain.model_copy(update={"retriever": retriever.with_filter({"document_id": document_id})})
+    return chain.run(query)
 
 @tool
-def pdf_search(query: str) -> str:
-    """Use this tool to answer questions based on the content of the uploaded PDF."""
-    return qa_chain.run(query)
+def pdf_search(query: str, source: Optional[str] = None) -> str:
+    """Use this tool to answer questions based on the content of the uploaded PDFs. Set `source` to a PDF file name or path to search only that document."""
+    document_id = None
+    if source:
+        matches = match_sources(source)
+        if not matches:
+            return f"No indexed PDF matches {source!r}. Indexed PDFs: {', '.join(sorted(indexed_sources.values()))}"
+        if len(matches) > 1:
+            # same file name in several folders; let the agent pick the path
+            paths = ", ".join(sorted(indexed_sources[m] for m in matches))
+            return f"Several indexed PDFs match {source!r}: {paths}. Call pdf_search again with one of these paths."
+        document_id = matches[0]
+    if answer_cache is None:
+        return run_qa(query, document_id)
+    answer = answer_cache.get(query, scope=document_id or "")
+    if answer is None:
+        answer = run_qa(query, document_id)
+        answer_cache.put(query, answer, scope=document_id or "")
+    return answer
 
 
 # GOOGLE WEB TOOL
-model = OpenAI()
-google_search = GoogleSerperAPIWrapper()
+search_cache = TTLCache()
 
 @tool
 def google_lookup(query: str) -> str:
     """Use this tool to answer questions with a live Google search using Serper API."""
-    return google_search.run(query)
+    return search_cache.get_or_set(normalize_query(query), lambda: google_search.run(query))
 
 
 
@@ -72,10 +99,27 @@ def devision(a:int, b:int) -> int:
     """for the devision of the numbers"""
     return a/b
 
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
 tools = [multiply,devision,addition,pdf_search,google_lookup]
-llm_with_tools = llm.bind_tools(tools)
-memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True, k=2)
+
+
+def summarize_turns(summary: str, messages: list) -> str:
+    """Fold turns that no longer fit the history budget into the running summary."""
+    if llm is None:
+        # arithmetic answered before warm-up finished; nothing to summarize with yet
+        return summary
+    transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages)
+    response = llm.invoke(
+        "Update the conversation summary with the new lines. Keep names, numbers and decisions; "
+        "answer with the summary only, at most 120 words.\n\n"
+        f"Current summary:\n{summary or '(empty)'}\n\nNew lines:\n{transcript}"
+    )
+    return response.content.strip()
+
+
+# One bounded history per session_id instead of a single global buffer.
+memory = SessionMemoryStore(
+    summarizer=summarize_turns if os.getenv("CHAT_HISTORY_SUMMARIZE", "0") == "1" else None
+)
 prompt = ChatPromptTemplate.from_messages([
     ("system", """
     For any math-related task, use the appropriate tools for addition, division, and multiplication of two numbers.
@@ -91,33 +135,270 @@ prompt = ChatPromptTemplate.from_messages([
     MessagesPlaceholder(variable_name="agent_scratchpad"),
 ])
 
-agent = create_tool_calling_agent(
-    llm=llm_with_tools,
-    tools=tools,
-    prompt=prompt
-)
 
 
-agent_executor = AgentExecutor(
-    agent=agent,
-    tools=tools,
-    memory=memory,
-    verbose=True
-)
+AGENT_TAG = "agent"
+
+
+def warm_up():
+    """Build the index, retrievers, caches and agent. Runs once, off the event loop."""
+    global embeddings, db, ingestion_stats, retriever, llm, qa_chain, answer_cache, google_search, agent_executor
+    global indexed_sources
+
+    # imported here: langchain_openai, the agents package and Chroma alone take
+    # over a second to import, which would otherwise delay serving /healthz
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+    from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+    from langchain.chains import RetrievalQA
+    from langchain.utilities import GoogleSerperAPIWrapper
+    from langchain.agents import AgentExecutor, create_tool_calling_agent
+    from vector_index import load_or_build_index
+    from ingestion import PDF_SOURCES, discover_sources
+    from embedding_cache import CachedEmbeddings
+    from semantic_cache import SemanticCache
+    from bm25_index import BM25Index, HybridRetriever, RETRIEVER_K, documents_from_store
+
+    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    google_search = GoogleSerperAPIWrapper()
+
+    # The index is persisted to CHROMA_PERSIST_DIR; only new or changed PDFs are re-embedded on startup.
+    # Index building and pdf_search queries both go through the embedding cache.
+    text_splitter=RecursiveCharacterTextSplitter(chunk_size=500,chunk_overlap=10)
+    embeddings = CachedEmbeddings(OpenAIEmbeddings())
+    # PDF_SOURCES: comma-separated PDF files or folders, streamed and embedded in parallel batches.
+    db, ingestion_stats = load_or_build_index(discover_sources(PDF_SOURCES.split(",")), embeddings, text_splitter)
+
+    documents = documents_from_store(db)
+    indexed_sources = {doc.metadata["document_id"]: doc.metadata["source"] for doc in documents}
+
+    # BM25 over the stored chunks, fused with the vector retriever (RETRIEVER_MODE=hybrid|lexical|vector).
+    retriever = HybridRetriever(
+        index=BM25Index(documents),
+        vector_retriever=db.as_retriever(search_kwargs={"k": RETRIEVER_K * 2}),
+        k=RETRIEVER_K,
+    )
+    qa_chain = RetrievalQA.from_chain_type(
+        llm=llm,
+        retriever=retriever,
+        return_source_documents=False
+    )
+
+    # Reuses answers for paraphrased questions, for the lifetime of this index build.
+    # Not used in lexical mode, where it would reintroduce a query embedding call.
+    answer_cache = SemanticCache(embeddings) if retriever.mode != "lexical" else None
+
+    # tagged so /chat/stream can tell the agent's own tokens from nested LLM calls;
+    # create_tool_calling_agent binds the tools to the model itself
+    agent = create_tool_calling_agent(
+        llm=llm,
+        tools=tools,
+        prompt=prompt
+    ).with_config(tags=[AGENT_TAG])
+
+    # /chat and /chat/stream use ainvoke/astream_events, which run the tool calls
+    # of one agent step concurrently.
+    agent_executor = AgentExecutor(
+        agent=agent,
+        tools=tools,
+        verbose=True
+    )
+
+
+ready = asyncio.Event()
+readiness = {"status": "starting", "error": None, "warm_up_seconds": None}
+
+
+async def run_warm_up():
+    start_time = time.perf_counter()
+    try:
+        await asyncio.to_thread(warm_up)
+    except Exception as e:
+        readiness.update(status="failed", error=str(e))
+        return
+    readiness.update(status="ready", warm_up_seconds=round(time.perf_counter() - start_time, 3))
+    ready.set()
+
+
+# Seconds a /chat request may wait for warm-up before getting a 503 (0 = fail fast).
+CHAT_READY_TIMEOUT_SECONDS = float(os.getenv("CHAT_READY_TIMEOUT_SECONDS", "0"))
 
 
-app = FastAPI(title="talent_Chatbot")
+async def wait_until_ready():
+    if ready.is_set():
+        return
+    if CHAT_READY_TIMEOUT_SECONDS > 0 and readiness["status"] == "starting":
+        try:
+            await asyncio.wait_for(ready.wait(), CHAT_READY_TIMEOUT_SECONDS)
+            return
+        except asyncio.TimeoutError:
+            pass
+    raise HTTPException(status_code=503, detail=f"Chatbot is {readiness['status']}", headers={"Retry-After": "5"})
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    task = asyncio.create_task(run_warm_up())
+    yield
+    task.cancel()
+
+
+app = FastAPI(title="talent_Chatbot", lifespan=lifespan)
 
 class ChatRequest(BaseModel):
     input: str
+    session_id: Optional[str] = None
+    trace: bool = False  # include tool/LLM timings in the response
 
 class ChatResponse(BaseModel):
     response: str
+    session_id: str
+    timings: Optional[List[dict]] = None
+
+# Concurrent agent runs per worker, sized to what the OpenAI account can take
+# rather than to the threadpool. Extra requests wait here instead of piling up
+# rate-limited calls upstream.
+CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", "16"))
+agent_slots = asyncio.Semaphore(CHAT_MAX_CONCURRENCY)
+
+# Pure arithmetic is answered locally; everything else falls through to the agent.
+router = ArithmeticRouter()
+
+
+def trace_config(request: ChatRequest, spans: Trace) -> dict:
+    """Run config that records tool and LLM spans, when the request or TRACE_EXPORT_PATH wants them."""
+    if request.trace or exporter is not None:
+        return {"callbacks": [TraceCallbackHandler(spans)]}
+    return {}
+
 
 @app.post("/chat", response_model=ChatResponse)
-def chat(request: ChatRequest):
+async def chat(request: ChatRequest):
+    session_id = request.session_id or uuid.uuid4().hex
+    spans = Trace("chat", session_id)
+    # arithmetic needs no warm-up, everything else waits for the agent
+    with spans.span("router"):
+        answer = router.route(request.input)
+    if answer is None:
+        await wait_until_ready()
+    error = None
+    try:
+        if answer is not None:
+            with spans.span("memory"):
+                await asyncio.to_thread(memory.append, session_id, request.input, answer)
+            return ChatResponse(response=answer, session_id=session_id,
+                                timings=spans.spans() if request.trace else None)
+
+        async with agent_slots:
+            # the SQLite backend does blocking I/O, keep it off the event loop
+            with spans.span("memory.load"):
+                chat_history = await asyncio.to_thread(memory.get_history, session_id)
+            start_time = time.perf_counter()
+            with spans.span("agent"):
+                result = await agent_executor.ainvoke({
+                    "input": request.input,
+                    "chat_history": chat_history,
+                }, config=trace_config(request, spans))
+            router.record_agent_run(time.perf_counter() - start_time)
+        # may call the LLM to summarize trimmed turns
+        with spans.span("memory"):
+            await asyncio.to_thread(memory.append, session_id, request.input, result["output"])
+        return ChatResponse(response=result["output"], session_id=session_id,
+                            timings=spans.spans() if request.trace else None)
+    except Exception as e:
+        error = str(e)
+        return ChatResponse(response=f"Error: {str(e)}", session_id=session_id,
+                            timings=spans.spans() if request.trace else None)
+    finally:
+        export(spans, error=error)
+
+
+async def chat_events(request: ChatRequest, session_id: str, answer: Optional[str]):
+    """SSE events for one agent run: tool calls and results, answer tokens, then the final answer."""
+    spans = Trace("chat_stream", session_id)
+    error = None
     try:
-        result = agent_executor.invoke({"input": request.input})
-        return ChatResponse(response=result["output"])
+        if answer is not None:
+            with spans.span("memory"):
+                await asyncio.to_thread(memory.append, session_id, request.input, answer)
+            yield {"event": "end", "data": json.dumps(end_event(request, session_id, answer, spans))}
+            return
+
+        async with agent_slots:
+            with spans.span("memory.load"):
+                chat_history = await asyncio.to_thread(memory.get_history, session_id)
+            start_time = time.perf_counter()
+            output = None
+            async for event in agent_executor.astream_events(
+                {"input": request.input, "chat_history": chat_history},
+                config=trace_config(request, spans),
+                version="v2",
+            ):
+                kind = event["event"]
+                if kind == "on_tool_start":
+                    yield {"event": "tool_start", "data": json.dumps(
+                        {"tool": event["name"], "input": event["data"].get("input")}, default=str)}
+                elif kind == "on_tool_end":
+                    yield {"event": "tool_end", "data": json.dumps(
+                        {"tool": event["name"], "output": str(event["data"].get("output"))})}
+                elif kind == "on_chat_model_stream" and AGENT_TAG in event.get("tags", []):
+                    # only the agent's model; the QA chain inside pdf_search streams too.
+                    # chunks that only carry tool-call arguments have no content
+                    content = event["data"]["chunk"].content
+                    if content:
+                        yield {"event": "token", "data": json.dumps({"token": content})}
+                elif kind == "on_chain_end" and event["name"] == agent_executor.get_name():
+                    output = event["data"]["output"]["output"]
+            router.record_agent_run(time.perf_counter() - start_time)
+
+        with spans.span("memory"):
+            await asyncio.to_thread(memory.append, session_id, request.input, output)
+        yield {"event": "end", "data": json.dumps(end_event(request, session_id, output, spans))}
     except Exception as e:
-        return ChatResponse(response=f"Error: {str(e)}")
+        error = str(e)
+        yield {"event": "error", "data": json.dumps({"response": f"Error: {str(e)}", "session_id": session_id})}
+    finally:
+        export(spans, error=error)
+
+
+def end_event(request: ChatRequest, session_id: str, response: str, spans: Trace) -> dict:
+    data = {"response": response, "session_id": session_id}
+    if request.trace:
+        data["timings"] = spans.spans()
+    return data
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    session_id = request.session_id or uuid.uuid4().hex
+    answer = router.route(request.input)
+    if answer is None:
+        await wait_until_ready()
+    return EventSourceResponse(chat_events(request, session_id, answer))
+
+
+@app.get("/healthz")
+def healthz():
+    # a failed warm-up will not recover on its own, let the orchestrator restart the pod
+    if readiness["status"] == "failed":
+        return JSONResponse(status_code=500, content=readiness)
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+def readyz():
+    if not ready.is_set():
+        return JSONResponse(status_code=503, content=readiness)
+    return readiness
+
+
+@app.get("/stats")
+def stats():
+    return {
+        "readiness": readiness,
+        "embedding_cache": embeddings.stats() if embeddings is not None else None,
+        "sessions": memory.stats(),
+        "arithmetic_router": router.stats(),
+        "answer_cache": answer_cache.stats() if answer_cache is not None else None,
+        "search_cache": search_cache.stats(),
+        "ingestion": ingestion_stats,
+    }
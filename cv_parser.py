@@ -6,20 +6,23 @@ import openai
 from config import OPENAI_API_KEY
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from langchain.chat_models import init_chat_model
 import re
-import json
+import orjson
 import pdfplumber
 from pdf2image import convert_from_path
 import pytesseract
 from dotenv import load_dotenv
 import os
+from schemas import CVFileResult, CVParsedData, CVParserResponse
+from tracing import Trace, export
 load_dotenv()
 
 api_key = os.getenv("OPENAI_API_KEY")
 client = openai.OpenAI(api_key=api_key)
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -34,6 +37,7 @@ class PromptRequest(BaseModel):
 
 class FolderPathRequest(BaseModel):
     folder_path: str
+    trace: bool = False  # include per-file stage timings in the results
 
 
 llm = init_chat_model("gpt-4o-mini", model_provider="openai")
@@ -114,26 +118,34 @@ class InvalidFileFormatException(Exception):
     """Custom exception for invalid file formats."""
     pass
 
-async def process_file(file_path: str):
+async def process_file(file_path: str, trace: bool = False):
+    # stage timings: returned with the result when `trace` is set, exported when TRACE_EXPORT_PATH is
+    spans = Trace("cv_parser", os.path.basename(file_path))
+    error = None
     try:
         
         # Step 1: Try extracting text using textract
-        content_bytes = textract.process(file_path)
-        content = content_bytes.decode("utf-8").strip()
+        with spans.span("textract") as attrs:
+            content_bytes = textract.process(file_path)
+            content = content_bytes.decode("utf-8").strip()
+            attrs["chars"] = len(content)
 
         # Step 2: Check if content is empty or unreadable
         if not content or len(content.split()) < 5:
             # Step 3: Check if the PDF contains selectable text using pdfplumber
-            with pdfplumber.open(file_path) as pdf:
-                pdf_text = "".join([page.extract_text() or "" for page in pdf.pages])
+            with spans.span("pdfplumber"):
+                with pdfplumber.open(file_path) as pdf:
+                    pdf_text = "".join([page.extract_text() or "" for page in pdf.pages])
 
             if not pdf_text.strip():
                 raise InvalidFileFormatException("CV is not in the correct format (image-based PDF detected). Please upload a text-based PDF.")
 
         # Step 4: If OCR is needed, apply it as a fallback
         if not content.strip():
-            images = convert_from_path(file_path)
-            content = "\n".join([pytesseract.image_to_string(img) for img in images]).strip()
+            with spans.span("ocr") as attrs:
+                images = convert_from_path(file_path)
+                content = "\n".join([pytesseract.image_to_string(img) for img in images]).strip()
+                attrs["pages"] = len(images)
 
             if not content or len(content.split()) < 5:
                 raise InvalidFileFormatException("CV is not in the correct format. Unable to extract readable text.")
@@ -141,21 +153,33 @@ async def process_file(file_path: str):
         # print("**************content*******", content)
 
         prompt = get_prompt(content)
-        response = await asyncio.to_thread(llm.invoke, prompt)
+        with spans.span("llm"):
+            response = await asyncio.to_thread(llm.invoke, prompt)
 
-        parsed_data = response.content if hasattr(response, "content") else str(response)
+        with spans.span("parse"):
+            parsed_data = response.content if hasattr(response, "content") else str(response)
 
-        parsed_data = re.sub(r"```json|```", "", parsed_data).strip()
-        parsed_data = json.loads(parsed_data)
+            parsed_data = re.sub(r"```json|```", "", parsed_data).strip()
+            parsed_data = CVParsedData.model_validate(orjson.loads(parsed_data))
 
-        return {"file": os.path.basename(file_path), "parsed_data": parsed_data}
+        return CVFileResult(
+            file=os.path.basename(file_path),
+            parsed_data=parsed_data,
+            timings=spans.spans() if trace else None,
+        )
 
     except InvalidFileFormatException as e:
+        error = str(e)
         raise HTTPException(status_code=400, detail=str(e))  # Return proper error in FastAPI
 
     except Exception as e:
+        error = str(e)
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")  # Other errors
-async def process_all_resumes(folder_path: str):
+
+    finally:
+        export(spans, error=error)
+
+async def process_all_resumes(folder_path: str, trace: bool = False):
     tasks = []
     
     if not os.path.exists(folder_path):
@@ -164,12 +188,14 @@ async def process_all_resumes(folder_path: str):
     for filename in os.listdir(folder_path):
         if filename.endswith(".pdf"):
             file_path = os.path.join(folder_path, filename)
-            tasks.append(process_file(file_path))
+            tasks.append(process_file(file_path, trace))
 
     return await asyncio.gather(*tasks)
 
 
-@app.post("/cv_parser")
+# no response_model: FastAPI would dump the model, validate it again and dump
+# it a second time; the schema is still documented through `responses`
+@app.post("/cv_parser", responses={200: {"model": CVParserResponse}})
 async def cv_parser(request: FolderPathRequest):
     folder_path = request.folder_path 
     if not folder_path:
@@ -177,15 +203,16 @@ async def cv_parser(request: FolderPathRequest):
     
     start_time = time.perf_counter()
     
-    results = await process_all_resumes(folder_path)
+    results = await process_all_resumes(folder_path, request.trace)
 
     elapsed_time = time.perf_counter() - start_time
-    response_data = {
-        "message": f"All files processed in {elapsed_time:.2f} seconds.",
-        "results": results
-    }
 
-    return json.loads(json.dumps(response_data, ensure_ascii=False, separators=(',', ':')))
+    # One model_dump and one orjson encode; the results are already validated.
+    response = CVParserResponse(
+        message=f"All files processed in {elapsed_time:.2f} seconds.",
+        results=results
+    )
+    return ORJSONResponse(response.model_dump(mode="json"))
 
 
 
@@ -0,0 +1,156 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+
+# Content-hash keyed embedding cache.
+#
+# Lookups go memory LRU -> SQLite file -> underlying model. Misses from one
+# embed_documents call are de-duplicated and sent to the model in batches of
+# `batch_size` texts.
+
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite3")
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+
+
+class SQLiteEmbeddingStore:
+    """On-disk key-value store of float32 vectors."""
+
+    def __init__(self, path: str = EMBEDDING_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> dict:
+        found = {}
+        with self._lock:
+            # stay below SQLite's host parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                )
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def set_many(self, items: dict):
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, array("f", vector).tobytes()) for key, vector in items.items()],
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """Wraps an Embeddings model with an in-memory LRU and a persistent store."""
+
+    def __init__(self, underlying: Embeddings, store=None, namespace: str = None,
+                 max_memory_items: int = EMBEDDING_CACHE_SIZE, batch_size: int = EMBEDDING_BATCH_SIZE):
+        self.underlying = underlying
+        self.store = store if store is not None else SQLiteEmbeddingStore()
+        # vectors from different models must never be mixed up
+        self.namespace = namespace or getattr(underlying, "model", None) or type(underlying).__name__
+        self.max_memory_items = max_memory_items
+        self.batch_size = batch_size
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "batches": 0}
+
+    def _key(self, kind: str, text: str) -> str:
+        return hashlib.sha256(f"{self.namespace}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, vector: List[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, keys: List[str]) -> dict:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+            self._stats["memory_hits"] += len(found)
+
+        remaining = [key for key in keys if key not in found]
+        if remaining:
+            on_disk = self.store.get_many(remaining)
+            with self._lock:
+                for key, vector in on_disk.items():
+                    self._remember(key, vector)
+                self._stats["disk_hits"] += len(on_disk)
+            found.update(on_disk)
+        return found
+
+    def _save(self, computed: dict):
+        self.store.set_many(computed)
+        with self._lock:
+            for key, vector in computed.items():
+                self._remember(key, vector)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key("doc", text) for text in texts]
+        unique = list(dict.fromkeys(keys))
+        found = self._lookup(unique)
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                missing.setdefault(key, text)
+
+        if missing:
+            missing_keys = list(missing)
+            for i in range(0, len(missing_keys), self.batch_size):
+                batch_keys = missing_keys[i:i + self.batch_size]
+                vectors = self.underlying.embed_documents([missing[key] for key in batch_keys])
+                computed = dict(zip(batch_keys, vectors))
+                self._save(computed)
+                found.update(computed)
+                with self._lock:
+                    self._stats["batches"] += 1
+            with self._lock:
+                self._stats["misses"] += len(missing)
+
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key("query", text)
+        found = self._lookup([key])
+        if key in found:
+            return found[key]
+
+        vector = self.underlying.embed_query(text)
+        self._save({key: vector})
+        with self._lock:
+            self._stats["misses"] += 1
+            self._stats["batches"] += 1
+        return vector
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_items"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
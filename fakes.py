@@ -0,0 +1,127 @@
+import hashlib
+import math
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field
+
+
+# Deterministic local stand-ins for OpenAI and Serper, for offline runs and
+# benchmarks.
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Feature-hashed bag-of-words embedder.
+
+    The same text always gives the same vector and texts sharing words end up
+    close in cosine space, so retrieval over it behaves sensibly without any
+    network call.
+    """
+
+    def __init__(self, size: int = 256):
+        self.size = size
+        self.model = f"hashing-{size}"
+        self.calls = 0
+        self.texts_embedded = 0
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.size
+        for token in TOKEN_RE.findall(text.lower()):
+            digest = hashlib.md5(token.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.size
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[index] += sign
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        self.texts_embedded += len(texts)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        self.texts_embedded += 1
+        return self._embed(text)
+
+
+class FakeSearch:
+    """Stand-in for GoogleSerperAPIWrapper with a fixed latency and a call counter."""
+
+    def __init__(self, latency: float = 0.0, results: dict = None):
+        self.latency = latency
+        self.results = results or {}
+        self.calls = 0
+
+    def run(self, query: str) -> str:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        return self.results.get(query, f"Search results for: {query}")
+
+
+class ToolPlanScript:
+    """
+    Script for ScriptedChatModel that follows a tool plan per question.
+
+    `plans` maps a question to its agent steps, each a list of tool calls
+    ({"name": ..., "args": {...}}) made in that step. Questions without a plan
+    send themselves to pdf_search once. After the last step the answer is the
+    tool outputs of the question joined together. Without tools bound (the
+    RetrievalQA call) the answer is the retrieved context.
+    """
+
+    def __init__(self, plans: Optional[Dict[str, List[List[dict]]]] = None):
+        self.plans = plans or {}
+
+    def __call__(self, messages: List[BaseMessage], tool_names: List[str]) -> AIMessage:
+        if not tool_names:
+            return AIMessage(content=str(messages[0].content))
+        start = max(i for i, m in enumerate(messages) if isinstance(m, HumanMessage))
+        question = messages[start].content
+        turn = messages[start + 1:]
+        plan = self.plans.get(question) or [[{"name": "pdf_search", "args": {"query": question}}]]
+        step = sum(1 for m in turn if isinstance(m, AIMessage) and m.tool_calls)
+        if step < len(plan):
+            return AIMessage(content="", tool_calls=[
+                {"name": call["name"], "args": call["args"], "id": f"call_{step}_{i}"}
+                for i, call in enumerate(plan[step])
+            ])
+        return AIMessage(content="\n".join(str(m.content) for m in turn if isinstance(m, ToolMessage)))
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Chat model whose replies come from `script(messages, tool_names)`.
+
+    Supports bind_tools, so it can drive the tool-calling agent offline.
+    `stats` is shared with every bound copy and counts the calls.
+    """
+    script: Callable[[List[BaseMessage], List[str]], AIMessage] = Field(default_factory=ToolPlanScript)
+    tool_names: List[str] = []
+    stats: Dict[str, int] = {}
+    latency: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        self.stats["calls"] = self.stats.get("calls", 0) + 1
+        message = self.script(messages, self.tool_names)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def bind_tools(self, tools, **kwargs):
+        names = [getattr(t, "name", None) or t.__name__ for t in tools]
+        return self.model_copy(update={"tool_names": names})
@@ -0,0 +1,169 @@
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, Iterator, List
+
+from langchain_community.document_loaders import PyPDFLoader
+
+
+# Streaming ingestion for the chatbot corpus.
+#
+# Pages are read one at a time, split as they arrive and collected into
+# batches of `batch_size` chunks. Each batch is embedded and written to the
+# vector store on a worker thread; at most `max_inflight` batches exist at once,
+# so memory stays bounded no matter how many PDFs are ingested.
+
+PDF_SOURCES = os.getenv("PDF_SOURCES", "attention.pdf")
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+
+
+def discover_sources(sources: Iterable[str]) -> List[str]:
+    """Expand directories to the PDFs they contain."""
+    paths = []
+    for source in sources:
+        source = source.strip()
+        if not source:
+            continue
+        if os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                paths.extend(os.path.join(root, name) for name in files if name.lower().endswith(".pdf"))
+        else:
+            paths.append(source)
+    return sorted(paths)
+
+
+def iter_pdf_pages(path: str) -> Iterator:
+    return PyPDFLoader(path).lazy_load()
+
+
+def chunk_ids(documents) -> list:
+    """Content-addressed ids, so an unchanged chunk keeps its id (and embedding)."""
+    ids = []
+    seen = {}
+    for doc in documents:
+        key = "\0".join([
+            str(doc.metadata.get("source", "")),
+            str(doc.metadata.get("page", "")),
+            doc.page_content,
+        ])
+        chunk_id = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        # identical chunks on the same page still need distinct ids
+        seen[chunk_id] = seen.get(chunk_id, 0) + 1
+        if seen[chunk_id] > 1:
+            chunk_id = f"{chunk_id}-{seen[chunk_id]}"
+        ids.append(chunk_id)
+    return ids
+
+
+class IngestionPipeline:
+
+    def __init__(self, db, text_splitter, batch_size: int = INGEST_BATCH_SIZE, workers: int = INGEST_WORKERS,
+                 max_inflight: int = None, loader=iter_pdf_pages):
+        self.db = db
+        self.text_splitter = text_splitter
+        self.batch_size = batch_size
+        self.loader = loader
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest")
+        self._slots = threading.BoundedSemaphore(max_inflight or workers * 2)
+        self._futures = []
+        self._batch = []
+        self._batch_ids = []
+        self._lock = threading.Lock()
+        self._stats = {"files": 0, "pages": 0, "chunks": 0, "embedded_chunks": 0, "batches": 0,
+                       "failed_batches": 0, "seconds": 0.0}
+
+    def _write(self, documents, ids):
+        try:
+            self.db.add_documents(documents, ids=ids)
+            with self._lock:
+                self._stats["embedded_chunks"] += len(ids)
+                self._stats["batches"] += 1
+        finally:
+            self._slots.release()
+
+    def _flush(self):
+        if not self._batch:
+            return
+        # blocks while max_inflight batches are still being embedded
+        self._slots.acquire()
+        document_ids = {doc.metadata["document_id"] for doc in self._batch}
+        self._futures.append((self._pool.submit(self._write, self._batch, self._batch_ids), document_ids))
+        self._batch, self._batch_ids = [], []
+
+    def ingest_file(self, path: str, document_id: str, existing_ids=frozenset()) -> List[str]:
+        """
+        Stream one PDF into the store, skipping chunks whose id is in
+        `existing_ids`. Returns the ids of all chunks of the file.
+        """
+        start = time.perf_counter()
+        file_name = os.path.basename(path)
+        all_ids = []
+        reused_ids, reused_metadatas = [], []
+        pages = 0
+        for page in self.loader(path):
+            pages += 1
+            chunks = self.text_splitter.split_documents([page])
+            ids = chunk_ids(chunks)
+            for chunk, chunk_id in zip(chunks, ids):
+                chunk.metadata.update({
+                    "document_id": document_id,
+                    "file_name": file_name,
+                    "chunk_index": len(all_ids),
+                })
+                all_ids.append(chunk_id)
+                if chunk_id in existing_ids:
+                    reused_ids.append(chunk_id)
+                    reused_metadatas.append(chunk.metadata)
+                    continue
+                self._batch.append(chunk)
+                self._batch_ids.append(chunk_id)
+                if len(self._batch) >= self.batch_size:
+                    self._flush()
+
+        # reused chunks are not re-embedded, but their chunk_index moves when
+        # content before them changed
+        for i in range(0, len(reused_ids), self.batch_size):
+            self.db._collection.update(
+                ids=reused_ids[i:i + self.batch_size], metadatas=reused_metadatas[i:i + self.batch_size]
+            )
+
+        with self._lock:
+            self._stats["files"] += 1
+            self._stats["pages"] += pages
+            self._stats["chunks"] += len(all_ids)
+            self._stats["seconds"] += time.perf_counter() - start
+        return all_ids
+
+    def wait(self) -> dict:
+        """
+        Write the last partial batch and wait for every batch. Returns
+        {document_id: error} for the files that had chunks in a failed batch.
+        """
+        start = time.perf_counter()
+        self._flush()
+        futures, self._futures = self._futures, []
+        failed = {}
+        for future, document_ids in futures:
+            try:
+                future.result()
+            except Exception as e:
+                with self._lock:
+                    self._stats["failed_batches"] += 1
+                for document_id in document_ids:
+                    failed.setdefault(document_id, f"{type(e).__name__}: {e}")
+        with self._lock:
+            self._stats["seconds"] += time.perf_counter() - start
+        return failed
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["chunks_per_second"] = round(stats["embedded_chunks"] / stats["seconds"], 2) if stats["seconds"] else 0.0
+        stats["seconds"] = round(stats["seconds"], 3)
+        return stats
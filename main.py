@@ -5,15 +5,20 @@ from config import OPENAI_API_KEY
 from fastapi.responses import HTMLResponse
 import json
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict, Union, List
+from typing import Dict, Union, List, Literal, Optional
 import re
+import os
+import asyncio
+import html
 import markdown
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from datetime import datetime 
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 client = openai.OpenAI(api_key=OPENAI_API_KEY)
 
-app = FastAPI(root_path="/api1")
+app = FastAPI(root_path="/api1", default_response_class=ORJSONResponse)
 
 # CORS Middleware Configuration
 app.add_middleware(
@@ -29,6 +34,8 @@ class PromptRequest(BaseModel):
 
 class JobDescriptionRequest(BaseModel):
     job_description: str
+    # "single": one completion for the whole contract, "parallel": one per section
+    mode: Optional[Literal["single", "parallel"]] = None
 
 class titleRequest(BaseModel):
     title: str
@@ -98,7 +105,7 @@ def openaiAI_bio(prompt: str):
             # Convert professionalBio to HTML wrapped in a div tag
             bio_data["professionalBio"] = f"<div>{markdown.markdown(bio_data['professionalBio'])}</div>"
 
-            return JSONResponse(content=bio_data, status_code=200)
+            return ORJSONResponse(content=bio_data, status_code=200)
 
         except json.JSONDecodeError:
             raise HTTPException(status_code=500, detail=f"Invalid JSON response: {response_text}")
@@ -447,6 +454,156 @@ def openAI_contract_generator(job_description: str):
         raise HTTPException(status_code=500, detail=f"Error generating contract: {str(e)}")
 
 
+# Section-parallel contract drafting.
+#
+# The job description is condensed once (cached per job description) and every
+# section is drafted by its own completion with its own token budget, so the
+# contract takes about as long as its slowest section and one long section
+# cannot truncate the others. The signature block is fixed and not generated.
+
+CONTRACT_MODE = os.getenv("CONTRACT_MODE", "single")
+CONTRACT_MAX_WORKERS = int(os.getenv("CONTRACT_MAX_WORKERS", "10"))
+CONTRACT_SUMMARY_CACHE_SIZE = int(os.getenv("CONTRACT_SUMMARY_CACHE_SIZE", "256"))
+
+contract_pool = ThreadPoolExecutor(max_workers=CONTRACT_MAX_WORKERS, thread_name_prefix="contract-section")
+
+# (heading, what to write, max_tokens, needs the full job description rather than the summary)
+CONTRACT_SECTIONS = [
+    ("Parties & Effective Date", "Identify the client and the contractor and state the effective date.", 200, False),
+    ("Scope of Work", "List the tasks and responsibilities based on the job description.", 500, True),
+    ("Deliverables", "List specific, tangible outputs based on the role.", 400, True),
+    ("Timeline", "Set Start/End dates to TBD and provide example milestones.", 300, False),
+    ("Payment Terms", "Generic terms with placeholders for amount, schedule, and method.", 300, False),
+    ("Intellectual Property Rights", "Who owns the work product and when ownership transfers.", 300, False),
+    ("Confidentiality Agreement", "Obligations of both parties regarding confidential information.", 300, False),
+    ("Termination Clause", "How and with what notice either party may end the contract.", 300, False),
+    ("Independent Contractor Status", "The contractor's status, taxes, and benefits.", 250, False),
+    ("Governing Law and Dispute Resolution", "Governing law and the dispute resolution process.", 250, False),
+]
+
+SIGNATURE_SECTION = {
+    "TalentExpert Client": "________________________",
+    "Title": "________________________",
+    "Date": "________________________",
+    "TalentRequester": "________________________",
+}
+
+
+def contract_completion(prompt: str, max_tokens: int) -> str:
+    # a cut-off answer is retried once with twice the budget
+    for budget in (max_tokens, max_tokens * 2):
+        response = client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "system", "content": "You are a legal assistant."},
+                      {"role": "user", "content": prompt}],
+            max_tokens=budget,
+        )
+        choice = response.choices[0]
+        if choice.message.content is None:
+            # refusals come back with no content and the reason in `refusal`
+            raise ValueError(f"model returned no content ({getattr(choice.message, 'refusal', None) or choice.finish_reason})")
+        if choice.finish_reason != "length":
+            return choice.message.content.strip()
+    raise ValueError(f"completion truncated even at {max_tokens * 2} tokens")
+
+
+@lru_cache(maxsize=CONTRACT_SUMMARY_CACHE_SIZE)
+def summarize_job_description(job_description: str) -> str:
+    return contract_completion(f"""
+        Summarize the job description below for a contract writer in at most 120 words: the role,
+        the main tasks, the expected outputs, the technologies or skills involved, and any duration,
+        budget, or location mentioned. Return only the summary.
+
+        Job Description:
+        {job_description}
+        """, max_tokens=250)
+
+
+def draft_contract_section(heading: str, instructions: str, max_tokens: int, job_context: str, current_date: str) -> str:
+    return contract_completion(f"""
+        You are a professional contract writer drafting one section of a freelance contract between
+        a platform called **TalentExpert** and a service provider (called **TalentRequester**).
+        Use professional legal language that stays clear for both technical and non technical readers.
+
+        Constants to use:
+        - Client Name: TalentExpert Client
+        - Contractor Name: TalentRequester
+        - Effective Date: {current_date}
+        - Start Date: TBD
+        - End Date: TBD
+
+        Job:
+        {job_context}
+
+        Section: {heading}
+        {instructions}
+
+        Write only the body of this section, without its heading, in at most {int(max_tokens * 0.6)} words.
+        Use short paragraphs; start bullet points with "- ". Include placeholders like `[Insert Amount]`,
+        `[Insert State]`, etc., where specific info is needed. No markdown headings, no extra commentary.
+        """, max_tokens=max_tokens)
+
+
+def section_html(text: str) -> str:
+    parts, bullets = [], []
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith(("- ", "* ", "• ")):
+            bullets.append(f"<li>{html.escape(line[2:].strip())}</li>")
+            continue
+        if bullets:
+            parts.append("<ul>" + "".join(bullets) + "</ul>")
+            bullets = []
+        if line:
+            parts.append(f"<p>{html.escape(line)}</p>")
+    if bullets:
+        parts.append("<ul>" + "".join(bullets) + "</ul>")
+    return "".join(parts)
+
+
+def openAI_contract_generator_parallel(job_description: str):
+    """
+    Same contract as openAI_contract_generator, drafted one section per request.
+
+    Returns:
+        A dictionary with a 'contract_html' key, sections in the usual order.
+    """
+    current_date = datetime.now().strftime("%B %d, %Y")
+    try:
+        summary_future = contract_pool.submit(summarize_job_description, job_description.strip())
+        futures = {}
+        # sections drafted from the full text start right away, alongside the summary
+        for heading, instructions, max_tokens, full_description in CONTRACT_SECTIONS:
+            if full_description:
+                futures[heading] = contract_pool.submit(
+                    draft_contract_section, heading, instructions, max_tokens, job_description, current_date
+                )
+        summary = summary_future.result()
+        for heading, instructions, max_tokens, full_description in CONTRACT_SECTIONS:
+            if not full_description:
+                futures[heading] = contract_pool.submit(
+                    draft_contract_section, heading, instructions, max_tokens, summary, current_date
+                )
+
+        html_contract = "<div class='contract-container'>"
+        for heading, *_ in CONTRACT_SECTIONS:
+            try:
+                text = futures[heading].result()
+            except ValueError as e:
+                raise ValueError(f"{heading}: {e}") from e
+            html_contract += f"<h4>{heading}</h4>" + section_html(text)
+        html_contract += "<h4>signatureSection</h4>"
+        html_contract += "<ul>" + "".join(f"<li><strong>{k}:</strong> {v}</li>" for k, v in SIGNATURE_SECTION.items()) + "</ul>"
+        html_contract += "</div>"
+
+        return {
+            "contract_html": html_contract
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error generating contract: {str(e)}")
+
+
 def openAI_article(title: str):
     try:
         contract_prompt = f"""You are an expert writer capable of generating concise, high-quality articles. Given a title, analyze its context to determine whether it is technical or non-technical. Based on your analysis, write a well-structured, engaging article between 200 to 250 words that fits the intent of the title. Follow these instructions:
@@ -515,6 +672,9 @@ async def generate_top_proposal(request: TestModel):
 
 @app.post("/generate_contract")
 async def generate_contract(request: JobDescriptionRequest):
+    if (request.mode or CONTRACT_MODE) == "parallel":
+        # waits on the section futures; off the event loop so other requests keep being served
+        return await asyncio.to_thread(openAI_contract_generator_parallel, request.job_description)
     return openAI_contract_generator(request.job_description)
 
 @app.post("/generate_articals")
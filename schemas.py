@@ -0,0 +1,83 @@
+from typing import Dict, List, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, field_validator
+
+
+# Models for the JSON returned by the CV parser (see cv_parser.get_prompt).
+# The LLM does not always follow the schema exactly, so fields are lenient:
+# missing values fall back to "" and unknown keys are ignored.
+
+class CVBaseModel(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    @field_validator("*", mode="before")
+    @classmethod
+    def none_to_default(cls, value, info):
+        field = cls.model_fields[info.field_name]
+        if value is None and not field.is_required():
+            return field.get_default(call_default_factory=True)
+        # numbers where text was asked for (2015 as a date, 10115 as a zip)
+        if field.annotation in (str, Optional[str]) and isinstance(value, (int, float)):
+            return str(value)
+        # a single object where a list was asked for
+        if getattr(field.annotation, "__origin__", None) is list and isinstance(value, dict):
+            return [value]
+        return value
+
+
+class CVEducation(CVBaseModel):
+    institution: str = ""
+    degree: str = ""
+    date: str = ""
+
+
+class CVExperience(CVBaseModel):
+    companyName: str = ""
+    role: str = ""
+    startDate: str = ""
+    endDate: str = ""
+    description: str = ""
+
+
+class CVParsedData(CVBaseModel):
+    firstName: str = ""
+    lastName: str = ""
+    email: str = ""
+    mobile: str = ""
+    about: str = ""
+    profilePicture: str = ""
+    title: Optional[str] = None
+    zip: str = ""
+    street: str = ""
+    address: str = ""
+    websiteLink: str = ""
+    education: List[CVEducation] = []
+    experience: List[CVExperience] = []
+    skills: List[str] = []
+
+    @field_validator("skills", mode="before")
+    @classmethod
+    def skills_to_str(cls, value):
+        # e.g. [{"name": "Python", "level": "expert"}] or ["Python", 3]
+        if isinstance(value, str):
+            return [value]
+        if not isinstance(value, list):
+            return value
+        skills = []
+        for item in value:
+            if isinstance(item, dict):
+                item = item.get("name") or ", ".join(str(v) for v in item.values() if v)
+            skills.append(str(item))
+        return skills
+
+
+class CVFileResult(BaseModel):
+    file: str
+    parsed_data: CVParsedData
+    # stage spans from tracing.Trace, only when the request asks for them
+    timings: Optional[List[dict]] = None
+
+
+class CVParserResponse(BaseModel):
+    message: str
+    results: Union[List[CVFileResult], Dict[str, str]]
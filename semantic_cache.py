@@ -0,0 +1,80 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+
+# Answer cache for pdf_search keyed by query meaning rather than exact text.
+#
+# A new query reuses a cached answer when the cosine similarity of the two
+# query embeddings is at least `threshold`. The cache is in-process and the
+# index is only (re)built by warm_up at startup, so every entry was answered
+# from the index currently being served; a rebuilt index means a new process
+# and an empty cache.
+
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "1000"))
+
+
+class SemanticCache:
+
+    def __init__(self, embeddings, threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 max_entries: int = SEMANTIC_CACHE_SIZE):
+        self.embeddings = embeddings
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (scope, query) -> (unit vector, answer)
+        self._matrix = None
+        self._keys = []
+        self._scopes = None
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    def _embed(self, query: str) -> np.ndarray:
+        vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _rebuild(self):
+        self._keys = list(self._entries)
+        self._matrix = np.stack([self._entries[k][0] for k in self._keys]) if self._keys else None
+        self._scopes = np.array([k[0] for k in self._keys], dtype=object)
+
+    def get(self, query: str, scope: str = "") -> Optional[str]:
+        """`scope` separates answers to the same question under different filters."""
+        vector = self._embed(query)
+        with self._lock:
+            if self._matrix is None and self._entries:
+                self._rebuild()
+            if self._matrix is not None:
+                scores = np.where(self._scopes == scope, self._matrix @ vector, -np.inf)
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    key = self._keys[best]
+                    # LRU order only; the matrix row order is unaffected
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return self._entries[key][1]
+            self._stats["misses"] += 1
+        return None
+
+    def put(self, query: str, answer: str, scope: str = ""):
+        vector = self._embed(query)
+        with self._lock:
+            key = (scope, query)
+            self._entries[key] = (vector, answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["threshold"] = self.threshold
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
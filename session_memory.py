@@ -0,0 +1,287 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+try:
+    import tiktoken
+except ImportError:  # token counts fall back to a chars/4 estimate (estimate_tokens)
+    tiktoken = None
+
+
+# Per-session chat history for /chat.
+#
+# Each session keeps its most recent turns within a token budget. Older turns
+# are dropped, or folded into a running summary when a summarizer is given.
+# Idle sessions expire after `ttl_seconds` and the least recently used ones are
+# evicted beyond `max_sessions`.
+
+CHAT_HISTORY_MAX_TOKENS = int(os.getenv("CHAT_HISTORY_MAX_TOKENS", "2000"))
+CHAT_SESSION_TTL_SECONDS = int(os.getenv("CHAT_SESSION_TTL_SECONDS", "3600"))
+CHAT_MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", "10000"))
+CHAT_SESSION_BACKEND = os.getenv("CHAT_SESSION_BACKEND", "memory")
+CHAT_SESSION_DB_PATH = os.getenv("CHAT_SESSION_DB_PATH", "chat_sessions.sqlite3")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def make_token_counter(model: str = "gpt-4o-mini") -> Callable[[str], int]:
+    """
+    Token counter for `model`. The tiktoken encoding is loaded on first use,
+    since a cold cache downloads it; if that fails counts are estimated.
+    """
+    if tiktoken is None:
+        return estimate_tokens
+    encoding = None
+
+    def count(text: str) -> int:
+        nonlocal encoding
+        if encoding is None:
+            try:
+                try:
+                    encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                # offline with a cold cache; don't retry the download on every call
+                encoding = False
+        if encoding is False:
+            return estimate_tokens(text)
+        return len(encoding.encode(text))
+
+    return count
+
+
+class InMemorySessionBackend:
+
+    def __init__(self):
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, session_id: str, idle_before: float = 0.0) -> Optional[dict]:
+        """The session, or None if it is missing or was last used before `idle_before`."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if session["last_access"] < idle_before:
+                del self._sessions[session_id]
+                return None
+            session["last_access"] = time.time()
+            self._sessions.move_to_end(session_id)
+            return {"summary": session["summary"], "messages": list(session["messages"])}
+
+    def save(self, session_id: str, summary: str, messages: List[dict]):
+        with self._lock:
+            self._sessions[session_id] = {
+                "summary": summary,
+                "messages": list(messages),
+                "last_access": time.time(),
+            }
+            self._sessions.move_to_end(session_id)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def evict(self, idle_before: float, max_sessions: int) -> int:
+        evicted = 0
+        with self._lock:
+            for session_id in [sid for sid, s in self._sessions.items() if s["last_access"] < idle_before]:
+                del self._sessions[session_id]
+                evicted += 1
+            while len(self._sessions) > max_sessions:
+                self._sessions.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+
+class SQLiteSessionBackend:
+
+    def __init__(self, path: str = CHAT_SESSION_DB_PATH):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chat_sessions ("
+            "session_id TEXT PRIMARY KEY, summary TEXT NOT NULL, "
+            "messages TEXT NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS chat_sessions_last_access ON chat_sessions (last_access)"
+        )
+        self._conn.commit()
+
+    def load(self, session_id: str, idle_before: float = 0.0) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, messages, last_access FROM chat_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[2] < idle_before:
+                self._conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+                self._conn.commit()
+                return None
+            self._conn.execute(
+                "UPDATE chat_sessions SET last_access = ? WHERE session_id = ?", (time.time(), session_id)
+            )
+            self._conn.commit()
+        return {"summary": row[0], "messages": json.loads(row[1])}
+
+    def save(self, session_id: str, summary: str, messages: List[dict]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chat_sessions (session_id, summary, messages, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (session_id, summary, json.dumps(messages, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM chat_sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+    def evict(self, idle_before: float, max_sessions: int) -> int:
+        with self._lock:
+            evicted = self._conn.execute(
+                "DELETE FROM chat_sessions WHERE last_access < ?", (idle_before,)
+            ).rowcount
+            evicted += self._conn.execute(
+                "DELETE FROM chat_sessions WHERE session_id IN ("
+                "SELECT session_id FROM chat_sessions ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (max_sessions,),
+            ).rowcount
+            self._conn.commit()
+        return evicted
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chat_sessions").fetchone()[0]
+
+
+def make_backend(name: str = CHAT_SESSION_BACKEND):
+    if name == "memory":
+        return InMemorySessionBackend()
+    if name == "sqlite":
+        return SQLiteSessionBackend()
+    raise ValueError(f"Unknown chat session backend: {name}")
+
+
+class SessionMemoryStore:
+    """
+    Token-bounded conversation history per session_id.
+
+    `summarizer(summary, messages) -> str` is optional; when set, turns that
+    fall out of the budget are folded into the session summary instead of
+    being dropped.
+    """
+
+    def __init__(self, backend=None, max_tokens: int = CHAT_HISTORY_MAX_TOKENS,
+                 ttl_seconds: int = CHAT_SESSION_TTL_SECONDS, max_sessions: int = CHAT_MAX_SESSIONS,
+                 summarizer: Optional[Callable[[str, List[dict]], str]] = None,
+                 count_tokens: Optional[Callable[[str], int]] = None, evict_every: int = 100):
+        self.backend = backend if backend is not None else make_backend()
+        self.max_tokens = max_tokens
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self.summarizer = summarizer
+        self.count_tokens = count_tokens or make_token_counter()
+        self.evict_every = evict_every
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._session_locks = {}  # session_id -> [lock, holders]; dropped when the last holder leaves
+        self._stats = {"turns": 0, "trimmed_turns": 0, "summaries": 0, "evicted_sessions": 0}
+
+    def _load(self, session_id: str) -> Optional[dict]:
+        # expired sessions are dropped here too, the eviction sweep only runs every `evict_every` writes
+        return self.backend.load(session_id, idle_before=time.time() - self.ttl_seconds)
+
+    def get_history(self, session_id: str) -> list:
+        session = self._load(session_id)
+        if session is None:
+            return []
+        history = []
+        if session["summary"]:
+            history.append(SystemMessage(content=f"Summary of the earlier conversation: {session['summary']}"))
+        for message in session["messages"]:
+            cls = HumanMessage if message["role"] == "human" else AIMessage
+            history.append(cls(content=message["content"]))
+        return history
+
+    @contextmanager
+    def _session_lock(self, session_id: str):
+        with self._lock:
+            entry = self._session_locks.setdefault(session_id, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._session_locks[session_id]
+
+    def _tokens(self, summary: str, messages: List[dict]) -> int:
+        return self.count_tokens(summary) + sum(self.count_tokens(m["content"]) for m in messages)
+
+    def append(self, session_id: str, human: str, ai: str):
+        # load -> trim -> save is serialized per session, so two concurrent
+        # requests on one session cannot drop each other's turn
+        with self._session_lock(session_id):
+            session = self._load(session_id) or {"summary": "", "messages": []}
+            summary = session["summary"]
+            messages = session["messages"] + [
+                {"role": "human", "content": human},
+                {"role": "ai", "content": ai},
+            ]
+
+            trimmed = []
+            # always keep the latest turn, even if it alone exceeds the budget
+            while len(messages) > 2 and self._tokens(summary, messages) > self.max_tokens:
+                trimmed.extend(messages[:2])
+                messages = messages[2:]
+
+            if trimmed and self.summarizer is not None:
+                summary = self.summarizer(summary, trimmed)
+
+            self.backend.save(session_id, summary, messages)
+
+        with self._lock:
+            self._stats["turns"] += 1
+            self._stats["trimmed_turns"] += len(trimmed) // 2
+            if trimmed and self.summarizer is not None:
+                self._stats["summaries"] += 1
+            self._writes += 1
+            run_eviction = self._writes % self.evict_every == 0
+        if run_eviction:
+            self.evict()
+
+    def clear(self, session_id: str):
+        self.backend.delete(session_id)
+
+    def evict(self) -> int:
+        evicted = self.backend.evict(time.time() - self.ttl_seconds, self.max_sessions)
+        with self._lock:
+            self._stats["evicted_sessions"] += evicted
+        return evicted
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["sessions"] = self.backend.count()
+        return stats
@@ -0,0 +1,40 @@
+import time
+
+import pytest
+
+from arithmetic_router import ArithmeticRouter, safe_eval
+
+
+@pytest.fixture
+def router():
+    return ArithmeticRouter()
+
+
+def test_spoken_operators(router):
+    assert router.route("what is 12 x 7?") == "12 * 7 = 84"
+    assert router.route("7 mod 3") == "7 % 3 = 1"
+
+
+@pytest.mark.parametrize("text", ["15% of 200", "2024-12-25", "555-1234"])
+def test_percentages_dates_and_phone_numbers_fall_through(router, text):
+    assert router.route(text) is None
+
+
+@pytest.mark.parametrize("expression", ["(9**99)**99", "10**100**2"])
+def test_huge_powers_are_refused_without_computing(router, expression):
+    with pytest.raises(ValueError):
+        safe_eval(expression)
+    start = time.perf_counter()
+    assert router.route(expression) is None
+    assert time.perf_counter() - start < 0.1
+
+
+def test_division_by_zero_falls_through(router):
+    assert router.route("10 / 0") is None
+
+
+def test_stats_count_hits_and_misses(router):
+    router.route("2 + 2")
+    router.route("who wrote the attention paper?")
+    stats = router.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
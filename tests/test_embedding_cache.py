@@ -0,0 +1,77 @@
+import pytest
+
+from embedding_cache import CachedEmbeddings, SQLiteEmbeddingStore
+from fakes import HashingEmbeddings
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteEmbeddingStore(str(tmp_path / "embeddings.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_misses_are_deduplicated_and_batched(store):
+    underlying = HashingEmbeddings()
+    cache = CachedEmbeddings(underlying, store=store, batch_size=2)
+
+    vectors = cache.embed_documents(["a", "b", "a", "c", "d", "e"])
+
+    assert vectors[0] == vectors[2] == HashingEmbeddings().embed_query("a")
+    assert underlying.texts_embedded == 5  # the repeated "a" is embedded once
+    assert underlying.calls == 3
+    stats = cache.stats()
+    assert stats["misses"] == 5
+    assert stats["batches"] == 3  # ceil(5 / 2)
+    assert stats["memory_hits"] == stats["disk_hits"] == 0
+
+
+def test_memory_hits_do_not_call_the_model(store):
+    underlying = HashingEmbeddings()
+    cache = CachedEmbeddings(underlying, store=store)
+    first = cache.embed_documents(["alpha", "beta"])
+    calls = underlying.calls
+
+    assert cache.embed_documents(["beta", "alpha"]) == first[::-1]
+    assert underlying.calls == calls
+    stats = cache.stats()
+    assert stats["memory_hits"] == 2
+    assert stats["hit_rate"] == 0.5
+
+
+def test_lru_evicts_to_disk_and_reloads(store):
+    underlying = HashingEmbeddings()
+    cache = CachedEmbeddings(underlying, store=store, max_memory_items=2)
+    cache.embed_documents(["one", "two", "three"])
+    assert cache.stats()["memory_items"] == 2
+
+    calls = underlying.calls
+    # "one" was evicted from memory but is still in SQLite
+    cache.embed_documents(["one"])
+    assert underlying.calls == calls
+    assert cache.stats()["disk_hits"] == 1
+    # and is now the most recent memory entry again
+    cache.embed_documents(["one"])
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_store_is_shared_across_instances(store):
+    CachedEmbeddings(HashingEmbeddings(), store=store).embed_documents(["persisted"])
+
+    underlying = HashingEmbeddings()
+    cache = CachedEmbeddings(underlying, store=store)
+    cache.embed_documents(["persisted"])
+    assert underlying.calls == 0
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_queries_documents_and_namespaces_are_kept_apart(store):
+    underlying = HashingEmbeddings()
+    cache = CachedEmbeddings(underlying, store=store)
+    cache.embed_documents(["same text"])
+    cache.embed_query("same text")
+    assert cache.stats()["misses"] == 2
+
+    other = CachedEmbeddings(HashingEmbeddings(size=64), store=store)
+    assert len(other.embed_query("same text")) == 64
+    assert other.stats()["misses"] == 1
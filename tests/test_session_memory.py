@@ -0,0 +1,55 @@
+import threading
+import time
+
+import pytest
+
+from session_memory import InMemorySessionBackend, SessionMemoryStore, SQLiteSessionBackend, estimate_tokens
+
+
+class SlowSaveBackend(InMemorySessionBackend):
+    """Widens the gap between load and save, where an unlocked append loses turns."""
+
+    def save(self, session_id, summary, messages):
+        time.sleep(0.05)
+        super().save(session_id, summary, messages)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return SlowSaveBackend()
+    return SQLiteSessionBackend(str(tmp_path / "sessions.sqlite3"))
+
+
+def test_concurrent_appends_keep_every_turn(backend):
+    memory = SessionMemoryStore(backend=backend, count_tokens=estimate_tokens)
+    threads = [threading.Thread(target=memory.append, args=("s1", f"question {i}", f"answer {i}"))
+               for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    history = memory.get_history("s1")
+    assert len(history) == 8
+    assert sorted(m.content for m in history[::2]) == [f"question {i}" for i in range(4)]
+    assert memory._session_locks == {}
+
+
+def test_trimmed_turns_are_summarized():
+    summaries = []
+
+    def summarizer(summary, messages):
+        summaries.append(messages)
+        return "earlier turns"
+
+    memory = SessionMemoryStore(backend=InMemorySessionBackend(), max_tokens=10, summarizer=summarizer,
+                                count_tokens=estimate_tokens)
+    memory.append("s1", "first question", "first answer")
+    memory.append("s1", "second question", "second answer")
+
+    history = memory.get_history("s1")
+    assert history[0].content == "Summary of the earlier conversation: earlier turns"
+    assert [m.content for m in history[1:]] == ["second question", "second answer"]
+    assert [m["content"] for m in summaries[0]] == ["first question", "first answer"]
+    assert memory.stats()["summaries"] == 1
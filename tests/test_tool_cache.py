@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from fakes import FakeSearch
+from tool_cache import TTLCache, normalize_query
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_normalize_query():
+    assert normalize_query("  Latest   NEWS\ttoday ") == "latest news today"
+
+
+def test_hit_within_ttl_and_expiry_after():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, clock=clock)
+    search = FakeSearch()
+
+    assert cache.get_or_set("q", lambda: search.run("q")) == "Search results for: q"
+    clock.now = 9.9
+    cache.get_or_set("q", lambda: search.run("q"))
+    assert search.calls == 1
+
+    clock.now = 10.0
+    cache.get_or_set("q", lambda: search.run("q"))
+    assert search.calls == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["expired"]) == (1, 2, 1)
+
+
+def test_lru_bound():
+    cache = TTLCache(ttl=10, max_entries=2, clock=FakeClock())
+    for key in ("a", "b", "c"):
+        cache.get_or_set(key, lambda: key)
+    assert cache.stats()["entries"] == 2
+    calls = []
+    cache.get_or_set("a", lambda: calls.append("a"))
+    assert calls == ["a"]
+
+
+def test_concurrent_callers_share_one_call():
+    cache = TTLCache(ttl=10, clock=FakeClock())
+    search = FakeSearch(latency=0.2)
+    results = []
+
+    def lookup():
+        results.append(cache.get_or_set("q", lambda: search.run("q")))
+
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert search.calls == 1
+    assert results == ["Search results for: q"] * 8
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (7, 1)
+
+
+def test_failures_are_not_cached_and_waiters_retry():
+    cache = TTLCache(ttl=10, clock=FakeClock())
+    started = threading.Event()
+    calls = []
+
+    def failing():
+        calls.append("fail")
+        started.set()
+        time.sleep(0.1)
+        raise RuntimeError("upstream down")
+
+    def waiter():
+        started.wait()
+        results.append(cache.get_or_set("q", lambda: calls.append("ok") or "value"))
+
+    results = []
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    with pytest.raises(RuntimeError):
+        cache.get_or_set("q", failing)
+    thread.join()
+
+    assert calls == ["fail", "ok"]
+    assert results == ["value"]
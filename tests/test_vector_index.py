@@ -0,0 +1,112 @@
+import os
+
+import pytest
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_core.documents import Document
+
+from fakes import HashingEmbeddings
+from vector_index import load_manifest, load_or_build_index
+
+
+def text_loader(path):
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+    if text:
+        yield Document(page_content=text, metadata={"source": path, "page": 0})
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    paths = []
+    for name, text in (("a.pdf", "alpha " * 50), ("b.pdf", "beta " * 50), ("scanned.pdf", "")):
+        path = tmp_path / name
+        path.write_text(text, encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def build(paths, persist_directory):
+    splitter = RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=0)
+    return load_or_build_index(paths, HashingEmbeddings(), splitter, persist_directory=persist_directory,
+                               collection_name="test-index", loader=text_loader)
+
+
+def test_removing_a_file_without_chunks(corpus, tmp_path):
+    persist_directory = str(tmp_path / "db")
+    build(corpus, persist_directory)
+    scanned = os.path.abspath(corpus[2])
+    assert load_manifest(persist_directory)["files"][scanned]["chunks"] == []
+
+    db, _ = build(corpus[:2], persist_directory)
+
+    assert scanned not in load_manifest(persist_directory)["files"]
+    assert len(db.get()["ids"]) > 0
+
+
+def test_removing_a_file_deletes_its_chunks(corpus, tmp_path):
+    persist_directory = str(tmp_path / "db")
+    db, _ = build(corpus, persist_directory)
+    before = len(db.get()["ids"])
+
+    db, _ = build(corpus[1:], persist_directory)
+
+    assert 0 < len(db.get()["ids"]) < before
+    assert not db.get(where={"source": corpus[0]})["ids"]
+
+
+def test_a_file_that_fails_to_load_is_skipped_and_retried(corpus, tmp_path):
+    persist_directory = str(tmp_path / "db")
+    broken = corpus[1]
+
+    def loader(path):
+        if path == broken:
+            raise ValueError("encrypted PDF")
+        return text_loader(path)
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=0)
+    db, stats = load_or_build_index(corpus, HashingEmbeddings(), splitter, persist_directory=persist_directory,
+                                    collection_name="test-index", loader=loader)
+
+    assert stats["failed_files"] == [{"path": broken, "error": "ValueError: encrypted PDF"}]
+    files = load_manifest(persist_directory)["files"]
+    assert os.path.abspath(broken) not in files
+    assert os.path.abspath(corpus[0]) in files
+
+    db, stats = build(corpus, persist_directory)
+    assert stats["failed_files"] == []
+    assert db.get(where={"source": broken})["ids"]
+
+
+class FailingEmbeddings(HashingEmbeddings):
+    """Fails every embed_documents call that contains `marker`."""
+
+    def __init__(self, marker: str):
+        super().__init__()
+        self.marker = marker
+
+    def embed_documents(self, texts):
+        if any(self.marker in text for text in texts):
+            raise RuntimeError("rate limited")
+        return super().embed_documents(texts)
+
+
+def test_a_failed_batch_leaves_the_file_for_the_next_start(corpus, tmp_path):
+    persist_directory = str(tmp_path / "db")
+    # only the last chunk fails, the earlier ones are stored and have to be removed again
+    mixed = tmp_path / "mixed.pdf"
+    mixed.write_text("gamma " * 50 + "boom", encoding="utf-8")
+    paths = corpus + [str(mixed)]
+    splitter = RecursiveCharacterTextSplitter(chunk_size=100, chunk_overlap=0)
+    db, stats = load_or_build_index(paths, FailingEmbeddings("boom"), splitter, persist_directory=persist_directory,
+                                    collection_name="test-index", loader=text_loader,
+                                    pipeline_options={"batch_size": 1})
+
+    assert stats["failed_files"] == [{"path": str(mixed), "error": "RuntimeError: rate limited"}]
+    assert stats["failed_batches"] == 1
+    assert str(mixed) not in load_manifest(persist_directory)["files"]
+    assert not db.get(where={"source": str(mixed)})["ids"]
+    assert db.get(where={"source": corpus[0]})["ids"]
+
+    db, stats = build(paths, persist_directory)
+    assert stats["failed_files"] == []
+    assert db.get(where={"source": str(mixed)})["ids"]
@@ -0,0 +1,77 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+
+# Short-lived result cache for tools that call external services
+# (google_lookup). Identical lookups within `ttl` seconds share one call, and
+# concurrent callers of the same key wait for the first one instead of all
+# hitting the API.
+
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "300"))
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "1000"))
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+class TTLCache:
+
+    def __init__(self, ttl: float = SEARCH_CACHE_TTL_SECONDS, max_entries: int = SEARCH_CACHE_SIZE,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0}
+
+    def get_or_set(self, key, compute: Callable[[], object]):
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if entry[0] > self.clock():
+                        self._entries.move_to_end(key)
+                        self._stats["hits"] += 1
+                        return entry[1]
+                    del self._entries[key]
+                    self._stats["expired"] += 1
+
+                waiter = self._inflight.get(key)
+                if waiter is None:
+                    done = self._inflight[key] = threading.Event()
+                    self._stats["misses"] += 1
+                    break
+            # another thread is computing this key; use its result once stored
+            waiter.wait()
+
+        try:
+            value = compute()
+            with self._lock:
+                self._entries[key] = (self.clock() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return value
+        finally:
+            # failures are not cached, waiters retry the call themselves
+            with self._lock:
+                del self._inflight[key]
+            done.set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
@@ -0,0 +1,141 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+# Per-request stage timings.
+#
+# A Trace collects spans (name, start offset and duration in ms) for one
+# request or file. Stages are wrapped with `trace.span(...)`; agent tool and
+# LLM calls are recorded by TraceCallbackHandler. Finished traces are appended
+# as one JSON object per line to TRACE_EXPORT_PATH when it is set.
+
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", "")
+
+
+class Trace:
+
+    def __init__(self, kind: str, name: str = ""):
+        self.kind = kind
+        self.name = name
+        self._start = time.perf_counter()
+        self._spans = []
+        self._lock = threading.Lock()
+
+    def _offset_ms(self, at: float) -> float:
+        return round((at - self._start) * 1000, 3)
+
+    def record(self, name: str, start: float, end: float, **attrs):
+        span = {"name": name, "start_ms": self._offset_ms(start), "duration_ms": round((end - start) * 1000, 3)}
+        span.update(attrs)
+        with self._lock:
+            self._spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        start = time.perf_counter()
+        try:
+            yield attrs
+        except Exception as e:
+            attrs["error"] = type(e).__name__
+            raise
+        finally:
+            self.record(name, start, time.perf_counter(), **attrs)
+
+    def spans(self) -> list:
+        with self._lock:
+            return sorted(self._spans, key=lambda s: s["start_ms"])
+
+    def to_dict(self, **attrs) -> dict:
+        record = {
+            "ts": time.time(),
+            "kind": self.kind,
+            "name": self.name,
+            "total_ms": self._offset_ms(time.perf_counter()),
+            "spans": self.spans(),
+        }
+        record.update(attrs)
+        return record
+
+
+class JSONLinesExporter:
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, record: dict):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+exporter = JSONLinesExporter(TRACE_EXPORT_PATH) if TRACE_EXPORT_PATH else None
+
+
+def export(trace: Trace, **attrs):
+    """Write the trace to TRACE_EXPORT_PATH; a failing export never fails the request."""
+    if exporter is None:
+        return
+    try:
+        exporter.export(trace.to_dict(**attrs))
+    except OSError:
+        pass
+
+
+class TraceCallbackHandler(BaseCallbackHandler):
+    """Records a span for every tool run and LLM call of an agent run into `trace`."""
+
+    # called directly instead of through run_in_executor from the async path,
+    # so the recorded times are not skewed by the executor queue
+    run_inline = True
+
+    def __init__(self, trace: Trace):
+        self.trace = trace
+        self._open = {}  # run_id -> (span name, start, attrs)
+        self._lock = threading.Lock()
+
+    def _start(self, run_id, name: str, **attrs):
+        with self._lock:
+            self._open[run_id] = (name, time.perf_counter(), attrs)
+
+    def _end(self, run_id, **attrs):
+        with self._lock:
+            started = self._open.pop(run_id, None)
+        if started is None:
+            return
+        name, start, start_attrs = started
+        self.trace.record(name, start, time.perf_counter(), **start_attrs, **attrs)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        self._start(run_id, f"tool.{kwargs.get('name') or (serialized or {}).get('name', 'unknown')}")
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=type(error).__name__)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+        self._start(run_id, "llm", **_model_attrs(kwargs))
+
+    def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+        self._start(run_id, "llm", **_model_attrs(kwargs))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        attrs = {"total_tokens": usage["total_tokens"]} if "total_tokens" in usage else {}
+        self._end(run_id, **attrs)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=type(error).__name__)
+
+
+def _model_attrs(kwargs: dict) -> dict:
+    model = (kwargs.get("metadata") or {}).get("ls_model_name")
+    return {"model": model} if model else {}
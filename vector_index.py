@@ -0,0 +1,149 @@
+import hashlib
+import json
+import os
+
+from langchain_community.vectorstores import Chroma
+
+from ingestion import IngestionPipeline, iter_pdf_pages
+
+
+# Persistent Chroma index for chatbot.py.
+#
+# The manifest (manifest.json next to the Chroma files) records a hash for
+# every indexed file and the content-addressed ids of its chunks. On startup
+# only files whose hash changed are streamed through the ingestion pipeline,
+# and only chunks that are not already in the collection are embedded again.
+
+CHROMA_PERSIST_DIR = os.getenv("CHROMA_PERSIST_DIR", "chroma_db")
+CHROMA_COLLECTION = os.getenv("CHROMA_COLLECTION", "talent_chatbot")
+MANIFEST_FILE = "manifest.json"
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def document_id(path: str) -> str:
+    """Stable id for every chunk of one file; unlike the file hash it survives edits."""
+    return hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+
+
+def splitter_signature(text_splitter) -> dict:
+    return {
+        # bumped when chunk metadata changes, so older indexes are rebuilt once
+        "schema": 3,
+        "splitter": type(text_splitter).__name__,
+        "chunk_size": getattr(text_splitter, "_chunk_size", None),
+        "chunk_overlap": getattr(text_splitter, "_chunk_overlap", None),
+    }
+
+
+def load_manifest(persist_directory: str) -> dict:
+    path = os.path.join(persist_directory, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"splitter": None, "files": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(persist_directory: str, manifest: dict):
+    os.makedirs(persist_directory, exist_ok=True)
+    path = os.path.join(persist_directory, MANIFEST_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_or_build_index(paths, embedding, text_splitter, persist_directory=CHROMA_PERSIST_DIR,
+                        collection_name=CHROMA_COLLECTION, loader=iter_pdf_pages, pipeline_options=None):
+    """
+    Open the persisted Chroma collection and bring it up to date with `paths`.
+
+    Returns (db, stats) with the ingestion stats of the files that changed.
+    Files that fail to load or store are listed in stats["failed_files"] and
+    retried on the next call instead of failing the whole build.
+    """
+    db = Chroma(
+        collection_name=collection_name,
+        embedding_function=embedding,
+        persist_directory=persist_directory,
+    )
+    manifest = load_manifest(persist_directory)
+
+    signature = splitter_signature(text_splitter)
+    if manifest.get("splitter") != signature:
+        # chunking changed, every stored chunk is stale
+        stale = [cid for entry in manifest["files"].values() for cid in entry["chunks"]]
+        if stale:
+            db.delete(ids=stale)
+        manifest = {"splitter": signature, "files": {}}
+
+    wanted = {os.path.abspath(p): p for p in paths}
+
+    for source in list(manifest["files"]):
+        if source not in wanted:
+            chunks = manifest["files"][source]["chunks"]
+            # scanned or empty PDFs are indexed with no chunks; chroma rejects an empty delete
+            if chunks:
+                db.delete(ids=chunks)
+            del manifest["files"][source]
+
+    pipeline = IngestionPipeline(db, text_splitter, loader=loader, **(pipeline_options or {}))
+    failed = {}  # source -> error
+    ingested = {}  # source -> (digest, ids), applied once every batch is stored
+    try:
+        for source, path in wanted.items():
+            entry = manifest["files"].get(source)
+            try:
+                digest = file_hash(path)
+                if entry and entry["hash"] == digest:
+                    continue
+                ids = pipeline.ingest_file(path, document_id=document_id(source),
+                                           existing_ids=set(entry["chunks"]) if entry else set())
+            except Exception as e:
+                # one unreadable PDF must not keep the rest of the corpus (and the chatbot) down
+                failed[source] = f"{type(e).__name__}: {e}"
+                continue
+            ingested[source] = (digest, ids)
+        failed_documents = pipeline.wait()
+    finally:
+        pipeline.close()
+
+    for source in ingested:
+        if document_id(source) in failed_documents:
+            failed[source] = failed_documents[document_id(source)]
+
+    for source, error in failed.items():
+        # drop whatever part of the new version got stored; the manifest entry is
+        # left as it was, so the file is retried on the next start
+        old_ids = set(manifest["files"][source]["chunks"]) if source in manifest["files"] else set()
+        partial = [cid for cid in db.get(where={"document_id": document_id(source)}, include=[])["ids"]
+                   if cid not in old_ids]
+        if partial:
+            db.delete(ids=partial)
+        ingested.pop(source, None)
+        print(f"Failed to index {wanted[source]}: {error}")
+
+    for source, (digest, ids) in ingested.items():
+        entry = manifest["files"].get(source)
+        old_ids = set(entry["chunks"]) if entry else set()
+        current_ids = set(ids)
+        removed = [cid for cid in old_ids if cid not in current_ids]
+        if removed:
+            db.delete(ids=removed)
+        manifest["files"][source] = {"hash": digest, "chunks": ids}
+        print(f"Indexed {wanted[source]}: {len(current_ids - old_ids)} new chunks, {len(removed)} removed, "
+              f"{len(current_ids & old_ids)} reused")
+
+    save_manifest(persist_directory, manifest)
+    stats = pipeline.stats()
+    stats["failed_files"] = [{"path": wanted[source], "error": error} for source, error in failed.items()]
+    if stats["embedded_chunks"]:
+        print(f"Ingested {stats['embedded_chunks']} chunks from {stats['files']} files "
+              f"in {stats['seconds']}s ({stats['chunks_per_second']} chunks/s)")
+    return db, stats